@@ -1,11 +1,14 @@
 from django.urls import path
 
+from core.replicas import replica_view
+
 from . import views
 
 app_name = "about"
 
 
 urlpatterns = [
-    path("author/", views.AboutAuthorView.as_view(), name="author"),
-    path("tech/", views.AboutTechView.as_view(), name="tech"),
+    path("author/", replica_view(views.AboutAuthorView.as_view()),
+         name="author"),
+    path("tech/", replica_view(views.AboutTechView.as_view()), name="tech"),
 ]
@@ -0,0 +1,81 @@
+"""SQLite для нагрузки: WAL, busy_timeout и повтор при блокировке.
+
+Подключается как ENGINE "core.backends.sqlite3". Прагмы можно
+переопределить через OPTIONS["pragmas"], число повторов — через
+OPTIONS["lock_retries"]. Транзакции открываются BEGIN IMMEDIATE:
+пишущая транзакция сразу ждёт блокировку записи через busy_timeout,
+а не падает с "database is locked" посреди работы.
+"""
+import time
+
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -20000,
+    "mmap_size": 134217728,
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+LOCK_RETRIES = 3
+RETRY_DELAY = 0.05
+
+
+def is_lock_error(error):
+    message = str(error)
+    return "database is locked" in message or "database is busy" in message
+
+
+def apply_pragmas(connection, pragmas):
+    for name, value in pragmas.items():
+        connection.execute(f"PRAGMA {name} = {value}")
+
+
+class RetryingCursorWrapper(base.SQLiteCursorWrapper):
+    """Повторяет запрос, если SQLite всё ещё занят после busy_timeout."""
+
+    lock_retries = LOCK_RETRIES
+
+    def _retry(self, method, query, params):
+        for attempt in range(self.lock_retries + 1):
+            try:
+                return method(query, params)
+            except base.Database.OperationalError as error:
+                if attempt == self.lock_retries or not is_lock_error(error):
+                    raise
+                time.sleep(RETRY_DELAY * 2 ** attempt)
+
+    def execute(self, query, params=None):
+        return self._retry(super().execute, query, params)
+
+    def executemany(self, query, param_list):
+        return self._retry(super().executemany, query, param_list)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        options = self.settings_dict["OPTIONS"]
+        self.pragmas = {**DEFAULT_PRAGMAS, **options.get("pragmas", {})}
+        self.lock_retries = options.get("lock_retries", LOCK_RETRIES)
+        params = super().get_connection_params()
+        params.pop("pragmas", None)
+        params.pop("lock_retries", None)
+        # Таймаут драйвера совпадает с busy_timeout, чтобы ожидание
+        # блокировки не обрывалось раньше.
+        params.setdefault("timeout", self.pragmas["busy_timeout"] / 1000)
+        return params
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        apply_pragmas(connection, self.pragmas)
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute("BEGIN IMMEDIATE")
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=RetryingCursorWrapper)
+        cursor.lock_retries = self.lock_retries
+        return cursor
@@ -0,0 +1,144 @@
+"""Общий для всех процессов кэш в отдельном файле SQLite.
+
+LocMemCache у каждого процесса свой, а поколения лент, фрагменты,
+отметки прогрева, счётчик главной и сессии должны видеть все воркеры
+и run_tasks. Файл лежит рядом с базой LOCATION (алиас из DATABASES):
+у него своя блокировка записи, и его запросы не попадают в бюджеты
+страниц. Для тестовой базы в памяти берётся временный файл процесса.
+"""
+import atexit
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SCHEMA = ("CREATE TABLE IF NOT EXISTS cache ("
+          "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)")
+# Проверять переполнение не на каждой записи.
+CULL_EVERY = 100
+
+_temp_path = None
+
+
+def temp_path():
+    global _temp_path
+    if _temp_path is None:
+        fd, _temp_path = tempfile.mkstemp(prefix="yatube-cache-",
+                                          suffix=".sqlite3")
+        os.close(fd)
+        atexit.register(remove_temp_files, _temp_path)
+    return _temp_path
+
+
+def remove_temp_files(path):
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(path + suffix)
+        except OSError:
+            pass
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        self.alias = location or DEFAULT_DB_ALIAS
+        self._local = threading.local()
+        self._writes = 0
+
+    def cache_path(self):
+        connection = connections[self.alias]
+        if connection.is_in_memory_db():
+            return temp_path()
+        return f"{connection.settings_dict['NAME']}-cache"
+
+    @property
+    def db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.cache_path(), timeout=5,
+                                 isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(SCHEMA)
+            self._local.db = db
+        return db
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _dump(self, value):
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        self.db.execute("DELETE FROM cache WHERE key = ? AND expires < ?",
+                        [key, time.time()])
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO cache VALUES (?, ?, ?)",
+            [key, self._dump(value), self.get_backend_timeout(timeout)])
+        return cursor.rowcount == 1
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version=version).get(key, default)
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key, version): key for key in keys}
+        if not keys:
+            return {}
+        placeholders = ", ".join("?" * len(keys))
+        rows = self.db.execute(
+            f"SELECT key, value FROM cache WHERE key IN ({placeholders}) "
+            "AND (expires IS NULL OR expires >= ?)",
+            [*keys, time.time()])
+        return {keys[key]: pickle.loads(value) for key, value in rows}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        self.db.executemany(
+            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+            [(self._key(key, version), self._dump(value), expires)
+             for key, value in data.items()])
+        self._writes += 1
+        if self._writes % CULL_EVERY == 0:
+            self._cull()
+        return []
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        cursor = self.db.execute(
+            "UPDATE cache SET expires = ? WHERE key = ?",
+            [self.get_backend_timeout(timeout), self._key(key, version)])
+        return cursor.rowcount == 1
+
+    def delete(self, key, version=None):
+        self.delete_many([key], version)
+
+    def delete_many(self, keys, version=None):
+        self.db.executemany("DELETE FROM cache WHERE key = ?",
+                            [(self._key(key, version),) for key in keys])
+
+    def has_key(self, key, version=None):
+        return key in self.get_many([key], version=version)
+
+    def clear(self):
+        self.db.execute("DELETE FROM cache")
+
+    def _cull(self):
+        self.db.execute("DELETE FROM cache WHERE expires < ?", [time.time()])
+        count = self.db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        if count > self._max_entries:
+            # Как DatabaseCache: выбрасывается каждая cull_frequency-я
+            # запись, в первую очередь те, что истекают раньше.
+            self.db.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache "
+                "ORDER BY expires IS NULL, expires LIMIT ?)",
+                [count // self._cull_frequency])
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, register
+
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs):
+    """Прогрев из run_tasks бесполезен, если кэш у каждого процесса свой."""
+    if (settings.TASKS_MODE != "db"
+            or not isinstance(caches["default"], PROCESS_LOCAL_CACHES)):
+        return []
+    return [Error(
+        "Задачи выполняет отдельный процесс run_tasks, а кэш по умолчанию "
+        "у каждого процесса свой: прогретые страницы и снятые отметки "
+        "обновления не увидит ни один веб-воркер.",
+        hint="Укажите в CACHES общий бэкенд: core.cache.SQLiteCache "
+             "или memcached.",
+        id="core.E001",
+    )]
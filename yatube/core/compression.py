@@ -0,0 +1,160 @@
+"""Сжатие ответов без буферизации и с уровнем по размеру.
+
+В отличие от GZipMiddleware, потоковые ответы (экспорт постов)
+сжимаются по мере генерации, а обычные — уровнем, зависящим от
+размера: маленькие страницы дёшево сжать сильно, большие сжимаются
+быстрее и слабее, чтобы не держать поток запроса. Brotli включается,
+если установлен пакет brotli и клиент его принимает.
+
+В stats копятся байты до и после сжатия по кодировкам, отношение
+считает compression_ratio().
+"""
+import re
+import zlib
+from collections import Counter
+
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_SIZE = 200
+COMPRESSIBLE_TYPES = re.compile(
+    r"^(text/|application/(json|javascript|xml|x-ndjson|jsonl|csv))")
+# (максимальный размер тела, уровень gzip, качество brotli)
+LEVELS = (
+    (64 * 1024, 6, 5),
+    (1024 * 1024, 4, 4),
+    (None, 1, 2),
+)
+STREAMING_LEVELS = (4, 4)
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+stats = Counter()
+
+
+def compression_ratio(encoding=None):
+    """Отношение сжатого размера к исходному, None без данных."""
+    prefixes = [encoding] if encoding else ["gzip", "br"]
+    raw = sum(stats[f"{prefix}:in"] for prefix in prefixes)
+    compressed = sum(stats[f"{prefix}:out"] for prefix in prefixes)
+    return compressed / raw if raw else None
+
+
+def levels_for(size):
+    for limit, gzip_level, brotli_quality in LEVELS:
+        if limit is None or size <= limit:
+            return gzip_level, brotli_quality
+
+
+def quality(params):
+    """Значение q из параметров кодировки; без него — 1."""
+    for param in params.split(";"):
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0
+    return 1
+
+
+def accepted_encodings(request):
+    """Кодировки из Accept-Encoding, кроме отвергнутых через q=0.
+
+    Общий разбор для сжатия ответов и для статики, чтобы они не
+    расходились в ответе одному и тому же клиенту.
+    """
+    header = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip() and quality(params) > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def choose_encoding(request):
+    accepted = accepted_encodings(request)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def make_compressor(encoding, gzip_level, brotli_quality):
+    """Функции compress(data), flush() и finish() одного компрессора."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=brotli_quality)
+        return compressor.process, compressor.flush, compressor.finish
+    compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, GZIP_WBITS)
+    return (compressor.compress,
+            lambda: compressor.flush(zlib.Z_SYNC_FLUSH),
+            compressor.flush)
+
+
+def compress_stream(chunks, encoding):
+    compress, flush, finish = make_compressor(encoding, *STREAMING_LEVELS)
+    raw = compressed = 0
+    try:
+        for chunk in chunks:
+            raw += len(chunk)
+            # Как compress_sequence в Django: без flush компрессор копит
+            # вывод до заполнения блока и задерживает первый байт.
+            data = compress(chunk) + flush()
+            if data:
+                compressed += len(data)
+                yield data
+        data = finish()
+        compressed += len(data)
+        yield data
+    finally:
+        stats[f"{encoding}:in"] += raw
+        stats[f"{encoding}:out"] += compressed
+
+
+class CompressionMiddleware:
+    """gzip/brotli для HTML, JSON и экспортов, включая потоковые."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        encoding = choose_encoding(request)
+        if encoding is None or not self.should_compress(response):
+            return response
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding)
+            del response["Content-Length"]
+        else:
+            content = response.content
+            if len(content) < MIN_SIZE:
+                return response
+            compress, _, finish = make_compressor(
+                encoding, *levels_for(len(content)))
+            compressed = compress(content) + finish()
+            if len(compressed) >= len(content):
+                return response
+            stats[f"{encoding}:in"] += len(content)
+            stats[f"{encoding}:out"] += len(compressed)
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        patch_vary_headers(response, ("Accept-Encoding",))
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            # Сжатое тело отличается побайтно, сильный ETag стал бы ложью.
+            response["ETag"] = "W/" + etag
+        return response
+
+    def should_compress(self, response):
+        if response.status_code != 200 or response.has_header(
+                "Content-Encoding"):
+            return False
+        content_type = response.get("Content-Type", "").lower()
+        return bool(COMPRESSIBLE_TYPES.match(content_type))
@@ -0,0 +1,133 @@
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+from core.backends.sqlite3.base import is_lock_error
+
+ENGINES = {
+    "stock": "django.db.backends.sqlite3",
+    "tuned": "core.backends.sqlite3",
+}
+SCHEMA = (
+    "CREATE TABLE post (id INTEGER PRIMARY KEY, text TEXT, pub_date REAL)",
+    "CREATE INDEX post_pub_date ON post (pub_date)",
+    "CREATE TABLE counter (id INTEGER PRIMARY KEY, posts_count INTEGER)",
+    "INSERT INTO counter VALUES (1, 0)",
+)
+
+
+def connect(mode, path):
+    """Алиас Django-подключения к path с ENGINE режима mode.
+
+    Запросы идут через настоящий DatabaseWrapper, поэтому в режиме
+    tuned работают прагмы, BEGIN IMMEDIATE в atomic() и повторы
+    RetryingCursorWrapper.
+    """
+    alias = f"benchmark_{mode}"
+    connections.databases[alias] = {"ENGINE": ENGINES[mode], "NAME": path}
+    return alias
+
+
+def read(alias):
+    with connections[alias].cursor() as cursor:
+        cursor.execute(
+            "SELECT id, text FROM post ORDER BY pub_date DESC LIMIT 10")
+        cursor.fetchall()
+
+
+def write(alias):
+    # Как post_create: чтение и запись счётчика в одной транзакции.
+    with transaction.atomic(using=alias):
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT posts_count FROM counter WHERE id = 1")
+            cursor.execute("INSERT INTO post (text, pub_date) VALUES (%s, %s)",
+                           ["benchmark", time.time()])
+            cursor.execute("UPDATE counter SET posts_count = posts_count + 1 "
+                           "WHERE id = 1")
+
+
+def worker(args):
+    mode, path, duration, write_ratio, seed = args
+    alias = connect(mode, path)
+    rng = random.Random(seed)
+    stats = {"reads": 0, "writes": 0, "errors": 0}
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        is_write = rng.random() < write_ratio
+        try:
+            if is_write:
+                write(alias)
+            else:
+                read(alias)
+            stats["writes" if is_write else "reads"] += 1
+        except OperationalError as error:
+            if not is_lock_error(error):
+                raise
+            stats["errors"] += 1
+        if mode == "stock":
+            # Стоковая конфигурация (CONN_MAX_AGE = 0) открывает
+            # соединение на каждый запрос.
+            connections[alias].close()
+    connections[alias].close()
+    return stats
+
+
+class Command(BaseCommand):
+    help = ("Многопроцессный бенчмарк SQLite через подключения Django: "
+            "стоковый бэкенд против core.backends.sqlite3 (WAL, "
+            "busy_timeout, BEGIN IMMEDIATE, повторы).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=8)
+        parser.add_argument("--duration", type=float, default=5.0)
+        parser.add_argument("--write-ratio", type=float, default=0.2)
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--json", action="store_true")
+
+    def handle(self, *args, **options):
+        results = {}
+        for mode in ENGINES:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                path = os.path.join(tmp_dir, "benchmark.sqlite3")
+                self.prepare(mode, path, options["rows"])
+                results[mode] = self.run(mode, path, options)
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode:>5}: чтений/с {result['reads_per_sec']:>9.1f}, "
+                f"записей/с {result['writes_per_sec']:>8.1f}, "
+                f"ошибок блокировки {result['errors']}")
+
+    def prepare(self, mode, path, rows):
+        alias = connect(mode, path)
+        with transaction.atomic(using=alias):
+            with connections[alias].cursor() as cursor:
+                for statement in SCHEMA:
+                    cursor.execute(statement)
+                cursor.executemany(
+                    "INSERT INTO post (text, pub_date) VALUES (%s, %s)",
+                    [("seed", i) for i in range(rows)])
+        # Дочерние процессы не должны унаследовать открытое соединение.
+        connections[alias].close()
+
+    def run(self, mode, path, options):
+        duration = options["duration"]
+        tasks = [(mode, path, duration, options["write_ratio"], seed)
+                 for seed in range(options["processes"])]
+        with multiprocessing.Pool(options["processes"]) as pool:
+            stats = pool.map(worker, tasks)
+        totals = {key: sum(item[key] for item in stats)
+                  for key in ("reads", "writes", "errors")}
+        return {
+            "reads_per_sec": totals["reads"] / duration,
+            "writes_per_sec": totals["writes"] / duration,
+            "errors": totals["errors"],
+        }
@@ -0,0 +1,225 @@
+import copy
+import json
+import math
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Max, Min
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from about import urls as about_urls
+from posts import urls as posts_urls
+from posts.models import Group, Post
+from users import urls as users_urls
+
+User = get_user_model()
+
+URL_MODULES = (posts_urls, users_urls, about_urls)
+# logout разлогинивает воркер посреди прогона.
+DEFAULT_EXCLUDE = ("users:logout",)
+SAMPLE_SIZE = 1000
+IN_BATCH = 500
+
+
+def percentile(values, share):
+    """Перцентиль по методу ближайшего ранга."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(math.ceil(share * len(ordered)) - 1, 0)]
+
+
+def url_names(exclude=()):
+    for module in URL_MODULES:
+        for pattern in module.urlpatterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            name = f"{module.app_name}:{pattern.name}"
+            if name not in exclude:
+                yield name, list(pattern.pattern.converters)
+
+
+class Samples:
+    """Случайные значения параметров маршрутов из текущей базы."""
+
+    def __init__(self, rng):
+        self.random = rng
+        self.usernames = list(User.objects.filter(posts__isnull=False)
+                              .distinct().values_list("username", flat=True)
+                              .order_by()[:SAMPLE_SIZE])
+        self.slugs = list(Group.objects.values_list("slug", flat=True)
+                          .order_by()[:SAMPLE_SIZE])
+        self.post_ids = self.sample_post_ids()
+        self.words = [word for text in Post.objects.values_list(
+            "text", flat=True)[:50] for word in text.split()[:3]]
+        if not self.usernames or not self.post_ids:
+            raise CommandError("В базе нет постов, запустите seed_scale.")
+
+    def sample_post_ids(self):
+        """Случайные id постов без ORDER BY RANDOM() по всей таблице.
+
+        Кандидаты берутся равномерно между min(id) и max(id), а дыры
+        от удалённых постов отсеивает один запрос по первичному ключу.
+        """
+        bounds = Post.objects.aggregate(low=Min("pk"), high=Max("pk"))
+        if bounds["low"] is None:
+            return []
+        candidates = {self.random.randint(bounds["low"], bounds["high"])
+                      for _ in range(SAMPLE_SIZE)}
+        candidates = sorted(candidates | {bounds["low"], bounds["high"]})
+        post_ids = []
+        # Порциями: SQLite ограничивает число параметров запроса.
+        for start in range(0, len(candidates), IN_BATCH):
+            post_ids += Post.objects.filter(
+                pk__in=candidates[start:start + IN_BATCH]).values_list(
+                "pk", flat=True).order_by()
+        return post_ids
+
+    def path(self, name, params, user):
+        kwargs = {}
+        for param in params:
+            if param == "post_id" and name == "posts:post_edit":
+                kwargs[param] = self.random.choice(
+                    self.own_posts(user) or self.post_ids)
+            elif param == "post_id":
+                kwargs[param] = self.random.choice(self.post_ids)
+            elif param == "username":
+                kwargs[param] = self.random.choice(self.usernames)
+            elif param == "slug" and self.slugs:
+                kwargs[param] = self.random.choice(self.slugs)
+            else:
+                return None
+        url = reverse(name, kwargs=kwargs)
+        if name == "posts:search" and self.words:
+            url += "?q=" + self.random.choice(self.words).strip(".,")
+        return url
+
+    def own_posts(self, user):
+        if user is None:
+            return []
+        if not hasattr(user, "_load_post_ids"):
+            user._load_post_ids = list(
+                Post.objects.filter(author=user)
+                .values_list("pk", flat=True)[:50])
+        return user._load_post_ids
+
+
+class Command(BaseCommand):
+    help = ("Нагрузочный прогон всех маршрутов posts, users и about "
+            "конкурентными воркерами. Для каждого имени маршрута печатает "
+            "JSON с p50/p95/p99 задержки, числом SQL-запросов и "
+            "пропускной способностью.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200,
+                            help="Запросов на каждый маршрут.")
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--username",
+                            help="Ходить авторизованным пользователем.")
+        parser.add_argument("--only", nargs="*", default=(),
+                            help="Только эти имена маршрутов.")
+        parser.add_argument("--exclude", nargs="*",
+                            default=list(DEFAULT_EXCLUDE))
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("-o", "--output", help="Файл для JSON.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        self.samples = Samples(rng)
+        self.user = None
+        if options["username"]:
+            try:
+                self.user = User.objects.get(username=options["username"])
+            except User.DoesNotExist:
+                raise CommandError(
+                    f"Пользователь {options['username']!r} не найден.")
+        self.cookies = None
+        if self.user is not None:
+            # Одна сессия на все воркеры, как у пользователя с вкладками.
+            client = Client()
+            client.force_login(self.user)
+            self.cookies = client.cookies
+        report = {}
+        for name, params in url_names(options["exclude"]):
+            if options["only"] and name not in options["only"]:
+                continue
+            paths = [self.samples.path(name, params, self.user)
+                     for _ in range(options["requests"])]
+            if None in paths:
+                self.stderr.write(f"{name}: нет данных для параметров, "
+                                  "пропускаю")
+                continue
+            report[name] = self.run(paths, options["workers"])
+            if options["verbosity"] > 1:
+                self.stderr.write(f"{name}: {report[name]}")
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+    def run(self, paths, workers):
+        """Гонит paths параллельно и сводит замеры по маршруту."""
+        results = []
+        lock = threading.Lock()
+        chunks = [paths[i::workers] for i in range(workers)]
+        threads = [threading.Thread(target=self.work,
+                                    args=(chunk, results, lock))
+                   for chunk in chunks if chunk]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        latencies = [latency for latency, _, _ in results]
+        queries = [count for _, count, _ in results]
+        return {
+            "requests": len(results),
+            "errors": sum(1 for _, _, status in results if status >= 500),
+            "statuses": sorted({status for _, _, status in results}),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "queries_avg": round(sum(queries) / len(queries), 2),
+            "queries_max": max(queries),
+            "throughput_rps": round(len(results) / elapsed, 1),
+        }
+
+    def work(self, paths, results, lock):
+        client = Client()
+        if self.cookies is not None:
+            client.cookies = copy.deepcopy(self.cookies)
+        measured = []
+        try:
+            for path in paths:
+                measured.append(self.request(client, path))
+        finally:
+            # Каждый поток открыл свои соединения с базой.
+            connections.close_all()
+        with lock:
+            results.extend(measured)
+
+    def request(self, client, path):
+        with ExitStack() as stack:
+            contexts = [stack.enter_context(CaptureQueriesContext(
+                connections[alias])) for alias in connections]
+            started = time.perf_counter()
+            try:
+                response = client.get(path)
+                if response.streaming:
+                    for _ in response.streaming_content:
+                        pass
+                status = response.status_code
+            except Exception:
+                status = 500
+            latency = time.perf_counter() - started
+        return latency, sum(len(context) for context in contexts), status
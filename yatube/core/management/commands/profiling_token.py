@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.profiling import make_token
+
+
+class Command(BaseCommand):
+    help = ("Печатает токен для заголовка X-Profile, "
+            "по которому ProfilingMiddleware профилирует запрос.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(make_token())
+        minutes = settings.PROFILING_TOKEN_MAX_AGE // 60
+        self.stderr.write(f"Токен действует {minutes} мин.")
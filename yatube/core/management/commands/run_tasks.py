@@ -0,0 +1,42 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.tasks import LEASE_SECONDS, process_batch, queue_depth
+
+
+class Command(BaseCommand):
+    help = "Воркер очереди фоновых задач core.Task (режим TASKS_MODE=db)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10)
+        parser.add_argument("--sleep", type=float, default=1.0,
+                            help="Пауза, когда очередь пуста, в секундах.")
+        parser.add_argument("--lease", type=int, default=LEASE_SECONDS,
+                            help="Через сколько секунд задачу упавшего "
+                                 "воркера заберёт другой.")
+        parser.add_argument("--once", action="store_true",
+                            help="Разобрать готовые задачи и выйти.")
+        parser.add_argument("--stats", action="store_true",
+                            help="Только напечатать глубину очереди.")
+
+    def handle(self, *args, **options):
+        if options["stats"]:
+            self.stdout.write(json.dumps(queue_depth(), indent=2))
+            return
+        processed = 0
+        try:
+            while True:
+                claimed = process_batch(options["batch_size"],
+                                        options["lease"])
+                processed += claimed
+                if claimed:
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
+        if options["verbosity"] > 0:
+            self.stdout.write(f"Выполнено задач: {processed}")
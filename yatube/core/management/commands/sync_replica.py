@@ -0,0 +1,29 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = ("Копирует основную SQLite-базу в файлы реплик из "
+            "DATABASE_REPLICAS. Подходит для локальной проверки реплик.")
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError(
+                "DATABASE_REPLICAS пуст: задайте YATUBE_REPLICA.")
+        source = connections["default"]
+        if source.vendor != "sqlite":
+            raise CommandError("Копирование файлом работает только с SQLite.")
+        source.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            connections[alias].close()
+            target = sqlite3.connect(settings.DATABASES[alias]["NAME"])
+            try:
+                # backup() копирует согласованный снимок даже под записью.
+                source.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(self.style.SUCCESS(
+                f"Реплика {alias} обновлена."))
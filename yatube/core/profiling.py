@@ -0,0 +1,159 @@
+"""Профилирование отдельных запросов на живом трафике.
+
+Запрос профилируется, если у него заголовок X-Profile с токеном от
+make_token() (manage.py profiling_token) или если он попал в долю
+PROFILING_SAMPLE_RATE. Для остальных запросов middleware стоит одну
+проверку заголовка и одно случайное число.
+
+На каждый профиль в PROFILING_DIR пишутся два файла: <id>.prof для
+pstats/snakeviz и <id>.json со сводкой — самые тяжёлые функции,
+время и число SQL-запросов, время рендеринга шаблонов. Хранятся
+последние PROFILING_KEEP профилей.
+"""
+import cProfile
+import json
+import os
+import pstats
+import random
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.template.base import Template
+
+HEADER = "HTTP_X_PROFILE"
+SALT = "core.profiling"
+TOP_FUNCTIONS = 25
+SLOW_QUERIES = 5
+# Время шаблонов — cumtime Template.render: он включает вложенные
+# шаблоны и include. Ключ pstats (файл, строка, имя) берётся из кода
+# функции, потому что у Node.render в том же файле то же имя.
+_render_code = Template.render.__code__
+TEMPLATE_RENDER = (_render_code.co_filename, _render_code.co_firstlineno,
+                   _render_code.co_name)
+
+
+def make_token():
+    return signing.TimestampSigner(salt=SALT).sign("profile")
+
+
+def has_valid_token(request):
+    token = request.META.get(HEADER)
+    if not token:
+        return False
+    try:
+        signing.TimestampSigner(salt=SALT).unsign(
+            token, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+class QueryTimer:
+    """execute_wrapper, который копит время и текст SQL-запросов."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((time.perf_counter() - started, sql))
+
+
+def template_time(stats):
+    row = stats.stats.get(TEMPLATE_RENDER)
+    return row[3] if row else 0.0
+
+
+def summarize(request, response, stats, timer, elapsed):
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][2],
+                  reverse=True)[:TOP_FUNCTIONS]
+    slow = sorted(timer.queries, reverse=True)[:SLOW_QUERIES]
+    match = request.resolver_match
+    return {
+        "path": request.get_full_path(),
+        "method": request.method,
+        "url_name": match.view_name if match else None,
+        "status": response.status_code,
+        "total_ms": round(elapsed * 1000, 2),
+        "sql_ms": round(sum(t for t, _ in timer.queries) * 1000, 2),
+        "sql_count": len(timer.queries),
+        "slow_queries": [{"ms": round(t * 1000, 2), "sql": sql}
+                         for t, sql in slow],
+        "template_ms": round(template_time(stats) * 1000, 2),
+        "top_functions": [
+            {"function": pstats.func_std_string(func), "calls": row[1],
+             "tottime_ms": round(row[2] * 1000, 2),
+             "cumtime_ms": round(row[3] * 1000, 2)}
+            for func, row in rows
+        ],
+    }
+
+
+def rotate(directory, keep):
+    profiles = sorted(
+        (entry for entry in os.scandir(directory)
+         if entry.name.endswith(".prof")),
+        key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in profiles[keep:]:
+        stem = entry.path[:-len(".prof")]
+        for path in (entry.path, stem + ".json"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class ProfilingMiddleware:
+    """Снимает cProfile и SQL-тайминги с выбранных запросов."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        timer = QueryTimer()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timer))
+            started = time.perf_counter()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Профилировщик уже запущен кем-то ещё.
+                return self.get_response(request)
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            elapsed = time.perf_counter() - started
+        profile_id = self.save(request, response, profiler, timer, elapsed)
+        response["X-Profile-Id"] = profile_id
+        return response
+
+    def should_profile(self, request):
+        if has_valid_token(request):
+            return True
+        rate = settings.PROFILING_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    def save(self, request, response, profiler, timer, elapsed):
+        directory = settings.PROFILING_DIR
+        os.makedirs(directory, exist_ok=True)
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        path = os.path.join(directory, profile_id)
+        profiler.dump_stats(path + ".prof")
+        stats = pstats.Stats(profiler)
+        summary = summarize(request, response, stats, timer, elapsed)
+        with open(path + ".json", "w", encoding="utf-8") as file:
+            json.dump(summary, file, ensure_ascii=False, indent=2)
+        rotate(directory, settings.PROFILING_KEEP)
+        return profile_id
@@ -0,0 +1,98 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+PIN_SESSION_KEY = "_pin_primary_until"
+READ_APP_LABELS = {"posts", "auth"}
+
+_state = threading.local()
+
+
+def replica_view(view):
+    """Помечает view только для чтения: её запросы могут идти в реплику."""
+    view.use_replica = True
+    return view
+
+
+def is_pinned(request):
+    """Пользователь только что писал и должен видеть свежие данные."""
+    session = getattr(request, "session", None)
+    return session is not None and (
+        session.get(PIN_SESSION_KEY, 0) > time.time())
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def remember_write(sender, update_fields=None, **kwargs):
+    """Запоминает, что запрос изменил данные, читаемые с реплики."""
+    if sender._meta.app_label not in READ_APP_LABELS:
+        return
+    # Вход обновляет только last_login — читать свои данные это не мешает.
+    if update_fields is not None and set(update_fields) == {"last_login"}:
+        return
+    _state.wrote = True
+
+
+def current_read_db():
+    if not getattr(_state, "use_replica", False):
+        return None
+    replicas = settings.DATABASE_REPLICAS
+    return random.choice(replicas) if replicas else None
+
+
+class ReplicaRouter:
+    """Чтение моделей постов и пользователей помеченных view — в реплику.
+
+    Сессии, админка и все записи остаются на основной базе.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in READ_APP_LABELS:
+            return current_read_db()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == "default"
+
+
+class ReplicaMiddleware:
+    """Включает реплику для помеченных view и закрепляет автора записи.
+
+    Если запрос записал посты или пользователей, сессия на
+    PIN_TO_PRIMARY_SECONDS читает только основную базу, чтобы
+    пользователь видел свои изменения, даже если реплика отстаёт.
+    Формы с ошибками, вход и поиск ничего не пишут и не закрепляют.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.wrote = False
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.use_replica = False
+            wrote, _state.wrote = _state.wrote, False
+        if (wrote and response.status_code < 400
+                and hasattr(request, "session")):
+            request.session[PIN_SESSION_KEY] = (
+                time.time() + settings.PIN_TO_PRIMARY_SECONDS)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not getattr(view_func, "use_replica", False):
+            return None
+        _state.use_replica = (bool(settings.DATABASE_REPLICAS)
+                              and not is_pinned(request))
+        return None
@@ -0,0 +1,145 @@
+"""Статика с хешами в именах, предсжатыми копиями и вечным кэшем.
+
+collectstatic с CompressedManifestStaticFilesStorage пишет рядом с
+каждым файлом name.<hash>.ext и, для текстовых форматов, .gz и .br
+(brotli — если установлен пакет brotli). StaticFilesMiddleware
+отдаёт такие файлы из STATIC_ROOT сама, без nginx и CDN: хешированные
+имена — с Cache-Control immutable на год, сжатая копия выбирается по
+Accept-Encoding.
+"""
+import gzip
+import mimetypes
+import os
+import re
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .compression import accepted_encodings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".map", ".svg", ".json", ".txt",
+                           ".html", ".xml", ".ico"}
+MIN_COMPRESS_SIZE = 256
+HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.[^./]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+SHORT_CACHE_CONTROL = "public, max-age=60"
+# Порядок предпочтения, если клиент принимает несколько кодировок.
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def compress_file(path):
+    """Пишет path.gz и path.br, если сжатие действительно помогает."""
+    with open(path, "rb") as file:
+        content = file.read()
+    if len(content) < MIN_COMPRESS_SIZE:
+        return []
+    variants = [(".gz", gzip.compress(content, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append((".br", brotli.compress(content)))
+    written = []
+    for suffix, compressed in variants:
+        if len(compressed) < len(content):
+            with open(path + suffix, "wb") as file:
+                file.write(compressed)
+            written.append(path + suffix)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage, который ещё и предсжимает файлы."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        names = set()
+        for name, hashed_name, processed in super().post_process(
+                paths, dry_run, **options):
+            if not isinstance(processed, Exception):
+                names.update((name, hashed_name or name))
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name in sorted(names):
+            if os.path.splitext(name)[1] in COMPRESSIBLE_EXTENSIONS:
+                compress_file(self.path(name))
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            if not self.unmanifested(name):
+                raise
+            return name
+
+    def unmanifested(self, name):
+        """Можно ли сослаться на name без хеша, а не падать."""
+        if settings.STATIC_MANIFEST_FALLBACK:
+            # Разработка: collectstatic ещё не запускали, исходный
+            # файл отдаст staticfiles.
+            return True
+        # Без манифеста в бою — ошибка. Обходится только файл, который
+        # собран, но в манифест не попал.
+        return (self.exists(self.manifest_name)
+                and self.exists(self.clean_name(urlsplit(name).path)))
+
+
+class StaticFilesMiddleware:
+    """Отдаёт собранную статику с длинным кэшем и предсжатыми копиями."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.root = settings.STATIC_ROOT
+
+    def __call__(self, request):
+        if (self.root and request.method in ("GET", "HEAD")
+                and request.path.startswith(self.prefix)):
+            response = self.serve(request, request.path[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+        stat = os.stat(path)
+        if not was_modified_since(request.META.get("HTTP_IF_MODIFIED_SINCE"),
+                                  stat.st_mtime, stat.st_size):
+            return self.cache_headers(HttpResponseNotModified(), name, stat)
+        content_type = mimetypes.guess_type(path)[0]
+        encoding, served_path = None, path
+        accepted = accepted_encodings(request)
+        for coding, suffix in ENCODINGS:
+            if coding in accepted and os.path.isfile(path + suffix):
+                encoding, served_path = coding, path + suffix
+                break
+        response = FileResponse(open(served_path, "rb"),
+                                filename=os.path.basename(path),
+                                content_type=content_type
+                                or "application/octet-stream")
+        response["Content-Length"] = os.path.getsize(served_path)
+        if encoding:
+            response["Content-Encoding"] = encoding
+        return self.cache_headers(response, name, stat)
+
+    def cache_headers(self, response, name, stat):
+        """Одинаковые заголовки кэширования для 200 и 304."""
+        response["Last-Modified"] = http_date(stat.st_mtime)
+        response["Vary"] = "Accept-Encoding"
+        response["Cache-Control"] = (
+            IMMUTABLE_CACHE_CONTROL if HASHED_NAME.search(name)
+            else SHORT_CACHE_CONTROL)
+        return response
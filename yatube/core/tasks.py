@@ -0,0 +1,197 @@
+"""Небольшая очередь фоновых задач.
+
+Задача — обычная функция с декоратором @task(); ставится в очередь
+через enqueue(func, *args, **kwargs) с JSON-сериализуемыми
+аргументами. Режим задаёт TASKS_MODE:
+
+* "db" — задача записывается в таблицу core.Task в текущей
+  транзакции, поэтому видна воркеру только после коммита, а при
+  откате исчезает вместе с данными. Выполняет manage.py run_tasks.
+* "thread" — для разработки: после коммита задача уходит в пул
+  потоков этого же процесса (с базой в памяти — как "immediate").
+* "immediate" — выполняется сразу после коммита в том же потоке.
+
+Упавшая задача повторяется с экспоненциальной задержкой, пока не
+кончатся max_attempts, после чего остаётся в таблице со статусом
+failed. Глубину очереди показывают queue_depth() и run_tasks --stats.
+"""
+import json
+import logging
+import threading
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+REGISTRY = {}
+MAX_ATTEMPTS = 5
+RETRY_DELAY = 10
+MAX_RETRY_DELAY = 60 * 60
+LEASE_SECONDS = 5 * 60
+
+stats = Counter()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def task(max_attempts=MAX_ATTEMPTS):
+    """Регистрирует функцию как задачу под именем module.function."""
+    def decorator(func):
+        func.task_name = f"{func.__module__}.{func.__name__}"
+        func.max_attempts = max_attempts
+        REGISTRY[func.task_name] = func
+        return func
+    return decorator
+
+
+def retry_delay(attempts):
+    return min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def enqueue(func, *args, **kwargs):
+    """Ставит задачу в очередь; выполнится только после коммита."""
+    payload = json.dumps({"args": args, "kwargs": kwargs})
+    mode = settings.TASKS_MODE
+    stats["enqueued"] += 1
+    if mode == "db":
+        return Task.objects.create(name=func.task_name, payload=payload,
+                                   max_attempts=func.max_attempts)
+    if mode == "thread" and not in_memory_db():
+        transaction.on_commit(lambda: get_executor().submit(
+            run_in_thread, func.task_name, payload))
+    else:
+        transaction.on_commit(lambda: run_with_retries(func.task_name,
+                                                       payload, sleep=False))
+    return None
+
+
+def in_memory_db():
+    # Базу SQLite в памяти (тесты) другой поток безопасно не разделит.
+    is_in_memory = getattr(connections["default"], "is_in_memory_db", None)
+    return bool(is_in_memory and is_in_memory())
+
+
+def call(name, payload):
+    # Без общей транзакции: BEGIN IMMEDIATE занял бы единственную
+    # блокировку записи SQLite на всё время задачи (SMTP, ресайз картинок,
+    # рендер страниц). Задача сама открывает короткий atomic() на запись.
+    data = json.loads(payload)
+    func = REGISTRY[name]
+    func(*data["args"], **data["kwargs"])
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.TASKS_THREADS,
+                thread_name_prefix="tasks")
+    return _executor
+
+
+def run_with_retries(name, payload, sleep=True):
+    max_attempts = REGISTRY[name].max_attempts
+    for attempt in range(1, max_attempts + 1):
+        try:
+            call(name, payload)
+        except Exception:
+            logger.exception("Задача %s упала, попытка %s", name, attempt)
+            stats["errors"] += 1
+            if attempt == max_attempts:
+                stats["failed"] += 1
+                return False
+            if sleep:
+                time.sleep(retry_delay(attempt))
+        else:
+            stats["done"] += 1
+            return True
+
+
+def run_in_thread(name, payload):
+    close_old_connections()
+    try:
+        return run_with_retries(name, payload)
+    finally:
+        close_old_connections()
+
+
+def runnable(now):
+    """Задачи в очереди, которым пора, и брошенные упавшим воркером."""
+    return (Q(status=Task.QUEUED, run_at__lte=now)
+            | Q(status=Task.RUNNING, locked_until__lt=now))
+
+
+def claim_tasks(limit, lease=LEASE_SECONDS):
+    """Забирает до limit задач; гонку воркеров решает условный UPDATE."""
+    now = timezone.now()
+    candidates = (Task.objects.filter(runnable(now)).order_by("run_at")
+                  .values_list("pk", flat=True)[:limit])
+    claimed = []
+    for pk in candidates:
+        taken = Task.objects.filter(runnable(now), pk=pk).update(
+            status=Task.RUNNING, attempts=F("attempts") + 1,
+            locked_until=now + timedelta(seconds=lease))
+        if taken:
+            claimed.append(pk)
+    return list(Task.objects.filter(pk__in=claimed))
+
+
+def run_task(task_row):
+    """Выполняет забранную задачу и удаляет её или планирует повтор."""
+    try:
+        if task_row.name not in REGISTRY:
+            raise LookupError(f"Неизвестная задача {task_row.name}")
+        call(task_row.name, task_row.payload)
+    except Exception:
+        stats["errors"] += 1
+        task_row.last_error = traceback.format_exc()
+        task_row.locked_until = None
+        if task_row.attempts >= task_row.max_attempts:
+            stats["failed"] += 1
+            task_row.status = Task.FAILED
+        else:
+            task_row.status = Task.QUEUED
+            task_row.run_at = timezone.now() + timedelta(
+                seconds=retry_delay(task_row.attempts))
+        task_row.save(update_fields=["status", "run_at", "locked_until",
+                                     "last_error"])
+        return False
+    stats["done"] += 1
+    task_row.delete()
+    return True
+
+
+def process_batch(limit=10, lease=LEASE_SECONDS):
+    """Выполняет одну порцию задач, возвращает число забранных."""
+    rows = claim_tasks(limit, lease)
+    for row in rows:
+        run_task(row)
+    return len(rows)
+
+
+def queue_depth():
+    """Число задач по статусам и возраст самой старой готовой задачи."""
+    now = timezone.now()
+    depth = {status: 0 for status, _ in Task.STATUS_CHOICES}
+    depth.update(Task.objects.order_by().values_list("status")
+                 .annotate(Count("pk")))
+    oldest = Task.objects.filter(status=Task.QUEUED, run_at__lte=now) \
+        .aggregate(oldest=Min("run_at"))["oldest"]
+    depth["oldest_ready_seconds"] = (
+        round((now - oldest).total_seconds(), 1) if oldest else 0)
+    if _executor is not None:
+        # В режиме thread очередь живёт в памяти процесса.
+        depth["thread_pending"] = _executor._work_queue.qsize()
+    return depth
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import Group, Post
+from .search import build_match, fts_available, matching_ids
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -10,6 +11,13 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ("pub_date",)
     empty_value_display = "-пусто-"
 
+    def get_search_results(self, request, queryset, search_term):
+        """Ищет по индексу FTS5 вместо LIKE '%term%' по всей таблице."""
+        if not fts_available() or build_match(search_term) is None:
+            return super().get_search_results(request, queryset,
+                                              search_term)
+        return queryset.filter(id__in=matching_ids(search_term)), False
+
 
 admin.site.register(Post, PostAdmin)
 
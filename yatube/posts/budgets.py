@@ -0,0 +1,23 @@
+from django.urls import resolve, reverse
+
+QUERY_BUDGETS = {}
+
+
+def query_budget(max_queries):
+    """Объявляет максимальное число SQL-запросов для view.
+
+    Бюджет считается для авторизованного пользователя, то есть уже
+    включает чтение сессии и пользователя. Значение хранится в
+    атрибуте view и в реестре QUERY_BUDGETS по имени функции.
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        QUERY_BUDGETS[view.__name__] = max_queries
+        return view
+    return decorator
+
+
+def get_query_budget(url_name, *args, **kwargs):
+    """Возвращает бюджет запросов view по имени маршрута posts:*."""
+    match = resolve(reverse(url_name, args=args, kwargs=kwargs))
+    return getattr(match.func, "query_budget", None)
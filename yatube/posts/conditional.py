@@ -0,0 +1,111 @@
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.db.models import Max
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .feed_cache import forget_stale, get_generation, served_stale
+from .models import Group, Post, User
+
+
+def _validator(last_updated, feeds):
+    """Метка последнего изменения: max(updated_at) и поколения лент.
+
+    Поколения сдвигаются и при удалении постов, которое updated_at
+    не отражает.
+    """
+    generations = [get_generation(feed) for feed in feeds]
+    stamps = [datetime.fromtimestamp(generation / 1000, tz=timezone.utc)
+              for generation in generations]
+    if last_updated is not None:
+        stamps.append(last_updated)
+    return generations, max(stamps)
+
+
+def index_state(request):
+    last_updated = Post.objects.aggregate(last=Max("updated_at"))["last"]
+    return _validator(last_updated, ["index"])
+
+
+def group_state(request, slug):
+    rows = (Group.objects.filter(slug=slug).values("pk")
+            .annotate(last=Max("posts__updated_at")).order_by()
+            .values_list("pk", "last")[:1])
+    if not rows:
+        return None
+    group_id, last_updated = rows[0]
+    return _validator(last_updated, [f"group:{group_id}"])
+
+
+def profile_state(request, username):
+    rows = (User.objects.filter(username=username).values("pk")
+            .annotate(last=Max("posts__updated_at")).order_by()
+            .values_list("pk", "last")[:1])
+    if not rows:
+        return None
+    author_id, last_updated = rows[0]
+    return _validator(last_updated, [f"author:{author_id}"])
+
+
+def post_state(request, post_id):
+    rows = (Post.objects.filter(pk=post_id).order_by()
+            .values_list("updated_at", "author_id")[:1])
+    if not rows:
+        return None
+    last_updated, author_id = rows[0]
+    # На странице поста выводится число постов автора.
+    return _validator(last_updated, [f"author:{author_id}"])
+
+
+def conditional_view(state_func):
+    """Отвечает 304 на If-None-Match/If-Modified-Since до рендера.
+
+    state_func делает один агрегирующий запрос; результат запоминается
+    в request, чтобы ETag и Last-Modified не считали его дважды.
+    Страница с прошлой версией фрагмента уходит без валидаторов: они
+    посчитаны уже по новому поколению, и после прогрева клиент получал
+    бы 304 на устаревшую страницу.
+    """
+    def get_state(request, *args, **kwargs):
+        if not hasattr(request, "_conditional_state"):
+            request._conditional_state = state_func(request, *args, **kwargs)
+        return request._conditional_state
+
+    def etag(request, *args, **kwargs):
+        state = get_state(request, *args, **kwargs)
+        if state is None:
+            return None
+        generations, last_modified = state
+        # Шапка страницы зависит от пользователя, а лента — от страницы.
+        user_id = (request.user.pk if request.user.is_authenticated
+                   else None)
+        raw = (f"{generations}|{last_modified.isoformat()}|"
+               f"{request.GET.urlencode()}|{user_id}")
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        # Last-Modified не различает пользователей и страницы, поэтому
+        # отдаётся только анонимам на первой странице ленты.
+        if request.user.is_authenticated or request.GET:
+            return None
+        state = get_state(request, *args, **kwargs)
+        return state[1] if state is not None else None
+
+    def decorator(view):
+        conditional = condition(etag_func=etag,
+                                last_modified_func=last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            forget_stale()
+            response = conditional(request, *args, **kwargs)
+            if served_stale():
+                del response["ETag"]
+                del response["Last-Modified"]
+                patch_cache_control(response, no_cache=True)
+            return response
+        return wrapper
+
+    return decorator
@@ -0,0 +1,50 @@
+import csv
+import json
+
+EXPORT_FIELDS = ("id", "text", "pub_date", "author", "group")
+CHUNK_SIZE = 2000
+
+
+def export_rows(queryset):
+    """Строки постов без создания экземпляров Post.
+
+    values() и iterator() читают курсор порциями по CHUNK_SIZE, так что
+    память не зависит от числа постов.
+    """
+    rows = (queryset.order_by("id")
+            .values_list("id", "text", "pub_date", "author__username",
+                         "group__slug")
+            .iterator(chunk_size=CHUNK_SIZE))
+    for post_id, text, pub_date, author, group in rows:
+        yield {
+            "id": post_id,
+            "text": text,
+            "pub_date": pub_date.isoformat(),
+            "author": author,
+            "group": group,
+        }
+
+
+def jsonl_lines(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+class _Echo:
+    """Буфер для csv.writer, который сразу отдаёт записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.DictWriter(_Echo(), fieldnames=EXPORT_FIELDS)
+    yield writer.writerow(dict(zip(EXPORT_FIELDS, EXPORT_FIELDS)))
+    for row in rows:
+        yield writer.writerow(row)
+
+
+FORMATS = {
+    "jsonl": (jsonl_lines, "application/x-ndjson; charset=utf-8"),
+    "csv": (csv_lines, "text/csv; charset=utf-8"),
+}
@@ -0,0 +1,166 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db import transaction
+
+FRAGMENT_TIMEOUT = 60 * 10
+GENERATION_TIMEOUT = None
+# Сколько читатели могут получать прошлую версию, если прогрев не
+# дошёл (например, воркер очереди лежит).
+REFRESH_TIMEOUT = 30
+
+stats = Counter()
+
+_state = threading.local()
+
+
+def generation_key(feed):
+    return f"posts:generation:{feed}"
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def get_generation(feed):
+    """Текущее поколение ленты, метка времени последнего изменения в мс.
+
+    Если ключ вытеснен из кэша, поколение берётся из текущего времени,
+    чтобы оно было больше любого из уже выданных.
+    """
+    key = generation_key(feed)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, now_ms(), GENERATION_TIMEOUT)
+        generation = cache.get(key)
+    return generation
+
+
+def get_generations(*feeds):
+    """Поколения нескольких лент одним обращением к кэшу."""
+    keys = [generation_key(feed) for feed in feeds]
+    found = cache.get_many(keys)
+    return tuple(found[key] if key in found else get_generation(feed)
+                 for feed, key in zip(feeds, keys))
+
+
+def _bump(feeds):
+    for feed in feeds:
+        key = generation_key(feed)
+        current = cache.get(key) or 0
+        cache.set(key, max(current + 1, now_ms()), GENERATION_TIMEOUT)
+
+
+def bump_generations(*feeds):
+    """Инвалидирует ленты за O(1): старые фрагменты просто не читаются.
+
+    Поколение сдвигается сразу и ещё раз после коммита, иначе читатель
+    между ними успел бы закэшировать старые данные под новым ключом.
+    """
+    feeds = {feed for feed in feeds if feed is not None}
+    _bump(feeds)
+    transaction.on_commit(lambda: _bump(feeds))
+
+
+def post_feeds(author_id, group_id):
+    """Ленты, в которых показывается пост."""
+    return ("index",
+            f"author:{author_id}" if author_id else None,
+            f"group:{group_id}" if group_id else None)
+
+
+def post_pages(post):
+    """Ленты и страница поста, которые меняются вместе с ним."""
+    feeds = {feed for feed in post_feeds(post.author_id, post.group_id)
+             if feed is not None}
+    if post.pk:
+        feeds.add(f"post:{post.pk}")
+    return feeds
+
+
+def refreshing_key(feed):
+    return f"posts:refreshing:{feed}"
+
+
+def latest_key(feed):
+    return f"posts:fragment:latest:{feed}"
+
+
+def mark_refreshing(feeds):
+    """Пока ленты пересобираются, читатели видят прошлую версию."""
+    cache.set_many({refreshing_key(feed): True for feed in feeds},
+                   REFRESH_TIMEOUT)
+
+
+def finish_refreshing(feeds):
+    cache.delete_many([refreshing_key(feed) for feed in feeds])
+
+
+def forget_stale():
+    _state.stale = False
+
+
+def served_stale():
+    """Отдавался ли в этом запросе фрагмент прошлой версии."""
+    return getattr(_state, "stale", False)
+
+
+@contextmanager
+def forced_render():
+    """Рендерить фрагменты заново, не глядя в кэш (для прогрева)."""
+    _state.forced = True
+    try:
+        yield
+    finally:
+        _state.forced = False
+
+
+def fragment_key(feed, posts):
+    """Ключ фрагмента: поколение ленты и состав постов на странице."""
+    digest = hashlib.md5()
+    for post in posts:
+        digest.update(f"{post.pk}:{post.pub_date.timestamp()};".encode())
+    generation = get_generation(feed)
+    return f"posts:fragment:{feed}:{generation}:{digest.hexdigest()}"
+
+
+def get_fragment(feed, posts, render, first_page=False, allow_stale=True):
+    """HTML фрагмента из кэша или render().
+
+    Для первой страницы хранится ещё и последняя отрендеренная версия:
+    пока лента помечена mark_refreshing, промах отдаёт её, а не
+    рендерит заново, — новую версию положит прогрев.
+    """
+    kind = feed.split(":")[0]
+    key = fragment_key(feed, posts)
+    if getattr(_state, "forced", False):
+        stats[f"{kind}:refresh"] += 1
+        return _render(key, feed, render, first_page)
+    if not first_page:
+        cached = {key: cache.get(key)}
+    else:
+        cached = cache.get_many([key, refreshing_key(feed), latest_key(feed)])
+    html = cached.get(key)
+    if html is not None:
+        stats[f"{kind}:hit"] += 1
+        return html
+    stale = cached.get(latest_key(feed))
+    if allow_stale and cached.get(refreshing_key(feed)) and stale is not None:
+        stats[f"{kind}:stale"] += 1
+        _state.stale = True
+        return stale
+    stats[f"{kind}:miss"] += 1
+    return _render(key, feed, render, first_page)
+
+
+def _render(key, feed, render, first_page):
+    html = render()
+    values = {key: html}
+    if first_page:
+        values[latest_key(feed)] = html
+    cache.set_many(values, FRAGMENT_TIMEOUT)
+    return html
@@ -1,4 +1,4 @@
-from django.forms import ModelForm
+from django.forms import ImageField, ModelForm
 
 from .models import Post
 
@@ -7,8 +7,11 @@ class PostForm(ModelForm):
 
     class Meta:
         model = Post
-        fields = ("text", "group")
+        fields = ("text", "group", "image")
         labels = {
             "text": "Текст поста",
             "group": "Группа",
+            "image": "Картинка",
         }
+        # Стандартное поле формы Django вместо ImageFormField из sorl.
+        field_classes = {"image": ImageField}
@@ -0,0 +1,64 @@
+"""Фиксированные рендишены картинок постов.
+
+Рендишены создаются заранее (задачей после сохранения поста), а
+шаблоны только ищут готовые в KV-хранилище sorl и никогда не
+генерируют их во время рендера ленты. Пока рендишенов нет, страница
+ссылается на оригинал.
+"""
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+
+# kind: (ширины/геометрии по возрастанию, атрибут sizes, опции sorl)
+RENDITIONS = {
+    "feed": (("480x270", "960x540"), "(min-width: 768px) 480px, 100vw",
+             {"crop": "center"}),
+    "detail": (("960", "1920"), "(min-width: 768px) 75vw, 100vw", {}),
+}
+
+
+class RenditionBackend(ThumbnailBackend):
+    def cached_thumbnail(self, file_, geometry_string, **options):
+        """Как get_thumbnail, но только из KV-хранилища, без генерации."""
+        source = ImageFile(file_)
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault("format", self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+
+backend = RenditionBackend()
+
+
+def generate_renditions(image):
+    for geometries, _, options in RENDITIONS.values():
+        for geometry in geometries:
+            backend.get_thumbnail(image, geometry, **options)
+
+
+def rendition(image, kind):
+    """src, srcset, sizes и размеры для <img>; None без картинки."""
+    if not image:
+        return None
+    geometries, sizes, options = RENDITIONS[kind]
+    thumbnails = [backend.cached_thumbnail(image, geometry, **options)
+                  for geometry in geometries]
+    if not all(thumbnails):
+        return {"src": image.url, "srcset": "", "sizes": "",
+                "width": None, "height": None}
+    return {
+        "src": thumbnails[0].url,
+        "srcset": ", ".join(f"{thumbnail.url} {thumbnail.width}w"
+                            for thumbnail in thumbnails),
+        "sizes": sizes,
+        "width": thumbnails[0].width,
+        "height": thumbnails[0].height,
+    }
@@ -0,0 +1,31 @@
+import threading
+
+MAX_WAIT = 25
+MAX_POSTS = 50
+
+_condition = threading.Condition()
+_latest_id = 0
+
+
+def notify_new_post(post_id):
+    """Будит запросы этого процесса, ждущие новых постов."""
+    global _latest_id
+    with _condition:
+        _latest_id = max(_latest_id, post_id)
+        _condition.notify_all()
+
+
+def latest_id():
+    return _latest_id
+
+
+def wait_for_post_after(post_id, timeout):
+    """Ждёт поста новее post_id не дольше timeout секунд.
+
+    post_id берётся не меньше latest_id() до запроса к базе, иначе
+    отфильтрованный чужой пост будил бы клиента сразу и по кругу.
+    Посты, созданные другими процессами, сюда не доходят: такой
+    запрос просто проснётся по таймауту и перечитает базу.
+    """
+    with _condition:
+        return _condition.wait_for(lambda: _latest_id > post_id, timeout)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = ("Заполняет готовый HTML и анонс постов порциями "
+            "(по умолчанию только у постов, где их ещё нет).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000,
+                            help="Сколько постов обновлять за транзакцию.")
+        parser.add_argument("--all", action="store_true",
+                            help="Пересчитать все посты, а не только пустые.")
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        posts = Post.objects.order_by("pk").only("id", "text")
+        if not options["all"]:
+            posts = posts.filter(text_html="")
+        last_pk, total = 0, 0
+        while True:
+            # Чтение и запись порции в одной транзакции: BEGIN IMMEDIATE
+            # не даёт правке вклиниться между ними и получить HTML
+            # старого текста.
+            with transaction.atomic():
+                chunk = list(posts.filter(pk__gt=last_pk)[:chunk_size])
+                if not chunk:
+                    break
+                for post in chunk:
+                    post.render_text()
+                Post.objects.bulk_update(chunk, ["text_html", "excerpt"])
+            last_pk = chunk[-1].pk
+            total += len(chunk)
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Обновлено постов: {total}")
+        self.stdout.write(self.style.SUCCESS(
+            f"HTML и анонсы заполнены, постов: {total}"))
@@ -0,0 +1,64 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.template import Context, Template
+
+from posts.models import Group, Post, User
+from posts.routes import _reverse
+
+# Цикл ленты до и после перехода на методы моделей; остальная разметка
+# одинаковая, поэтому разница — это стоимость {% url %}.
+REVERSED_LOOP = """{% for post in posts %}
+<a href="{% url 'posts:profile' post.author.username %}">автор</a>
+<a href="{% url 'posts:post_detail' post.pk %}">пост</a>
+{% if post.group %}
+<a href="{% url 'posts:slug' post.group.slug %}">группа</a>
+{% endif %}
+{% endfor %}"""
+MEMOIZED_LOOP = """{% for post in posts %}
+<a href="{{ post.get_author_url }}">автор</a>
+<a href="{{ post.get_absolute_url }}">пост</a>
+{% if post.group %}
+<a href="{{ post.group.get_absolute_url }}">группа</a>
+{% endif %}
+{% endfor %}"""
+
+
+class Command(BaseCommand):
+    help = ("Микробенчмарк рендеринга ссылок ленты: {% url %} против "
+            "запомненных post_route(). Базу не трогает.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=10,
+                            help="Постов на странице.")
+        parser.add_argument("--repeat", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        context = Context({"posts": self.make_page(options["posts"])})
+        repeat = options["repeat"]
+        cases = (
+            ("{% url %}", REVERSED_LOOP, False),
+            ("post_route, тёплый кэш", MEMOIZED_LOOP, False),
+            ("post_route, холодный кэш", MEMOIZED_LOOP, True),
+        )
+        baseline = None
+        for title, source, cold in cases:
+            template = Template(source)
+            _reverse.cache_clear()
+
+            def render():
+                if cold:
+                    _reverse.cache_clear()
+                template.render(context)
+
+            per_page_us = min(timeit.repeat(render, number=repeat,
+                                            repeat=3)) / repeat * 1e6
+            baseline = baseline or per_page_us
+            self.stdout.write(
+                f"{title:<26} {per_page_us:8.1f} мкс на страницу "
+                f"(x{baseline / per_page_us:.2f})")
+
+    def make_page(self, per_page):
+        return [Post(pk=i + 1, author=User(username=f"author{i}"),
+                     group=Group(slug=f"group-{i}") if i % 3 else None)
+                for i in range(per_page)]
@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.paginators import encode_cursor
+
+User = get_user_model()
+
+BAD_PLAN_STEPS = ("USE TEMP B-TREE",)
+
+
+def is_full_scan(detail):
+    """SCAN без индекса означает полный проход по таблице."""
+    return detail.startswith("SCAN") and "INDEX" not in detail
+
+
+class Command(BaseCommand):
+    help = ("Прогоняет EXPLAIN QUERY PLAN для запросов, которые строят "
+            "views ленты, и падает на полном скане или сортировке "
+            "во временном B-tree.")
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        if connection.vendor != "sqlite":
+            raise CommandError("Проверка планов поддерживает только SQLite.")
+        with transaction.atomic():
+            queries = self.collect_queries()
+            problems = self.check_plans(queries)
+            transaction.set_rollback(True)
+        if problems:
+            raise CommandError("\n\n".join(problems))
+        self.stdout.write(self.style.SUCCESS(
+            f"Проверено запросов: {len(queries)}, проблем нет."))
+
+    def collect_queries(self):
+        """Открывает страницы ленты на временных данных и копит SQL."""
+        user = User.objects.create_user(username="query-plan-check")
+        group = Group.objects.create(title="query-plan-check",
+                                     slug="query-plan-check")
+        posts = [Post.objects.create(author=user, group=group, text=str(i))
+                 for i in range(3)]
+        cursor = encode_cursor(posts[1])
+        urls = (
+            reverse("posts:index"),
+            reverse("posts:index") + f"?after={cursor}",
+            reverse("posts:index") + f"?before={cursor}",
+            reverse("posts:slug", args=[group.slug]),
+            reverse("posts:slug", args=[group.slug]) + f"?after={cursor}",
+            reverse("posts:profile", args=[user.username]),
+            reverse("posts:profile", args=[user.username])
+            + f"?after={cursor}",
+            reverse("posts:post_detail", args=[posts[0].pk]),
+        )
+        queries = []
+
+        def capture(execute, sql, params, many, context):
+            if sql.lstrip().upper().startswith("SELECT"):
+                queries.append((sql, params))
+            return execute(sql, params, many, context)
+
+        client = Client()
+        with connection.execute_wrapper(capture):
+            for url in urls:
+                client.get(url)
+        return queries
+
+    def check_plans(self, queries):
+        problems = []
+        with connection.cursor() as cursor:
+            for sql, params in queries:
+                cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+                details = [row[-1] for row in cursor.fetchall()]
+                bad = [detail for detail in details
+                       if is_full_scan(detail)
+                       or detail.startswith(BAD_PLAN_STEPS)]
+                if bad:
+                    problems.append("\n".join([sql] + bad))
+                if self.verbosity > 1:
+                    self.stdout.write("\n".join([sql] + details) + "\n")
+        return problems
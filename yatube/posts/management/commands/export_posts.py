@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.exports import FORMATS, export_rows
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Потоково выгружает посты автора или группы в JSONL или CSV."
+
+    def add_arguments(self, parser):
+        owner = parser.add_mutually_exclusive_group(required=True)
+        owner.add_argument("--author", help="username автора.")
+        owner.add_argument("--group", help="slug группы.")
+        parser.add_argument("--format", choices=sorted(FORMATS),
+                            default="jsonl")
+        parser.add_argument("--output", "-o",
+                            help="Файл для выгрузки, по умолчанию stdout.")
+
+    def handle(self, *args, **options):
+        if options["author"]:
+            lookup = {"author__username": options["author"]}
+            exists = User.objects.filter(username=options["author"])
+        else:
+            lookup = {"group__slug": options["group"]}
+            exists = Group.objects.filter(slug=options["group"])
+        if not exists.exists():
+            raise CommandError("Автор или группа не найдены.")
+        render_lines, _ = FORMATS[options["format"]]
+        lines = render_lines(export_rows(Post.objects.filter(**lookup)))
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8",
+                      newline="") as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
@@ -0,0 +1,196 @@
+import csv
+import io
+import json
+import sys
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.feed_cache import bump_generations, post_feeds
+from posts.models import (AuthorPostCounter, Group, GroupPostCounter,
+                          ImportCheckpoint, Post)
+from posts.paginators import INDEX_COUNT_KEY
+from posts.utils import keep_dates
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ("Потоково импортирует посты из JSONL или CSV (файл или stdin). "
+            "Поля записи: text, author (username), group (slug, "
+            "необязательно), pub_date (ISO 8601, необязательно).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу или - для stdin.")
+        parser.add_argument("--format", choices=("jsonl", "csv"),
+                            help="По умолчанию определяется по расширению.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--checkpoint",
+                            help="Имя отметки в базе с числом уже "
+                                 "обработанных записей, чтобы продолжить "
+                                 "после сбоя.")
+        parser.add_argument("--create-missing", action="store_true",
+                            help="Создавать неизвестных авторов и группы.")
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        self.create_missing = options["create_missing"]
+        self.authors, self.groups = {}, {}
+        self.skipped = self.errors = 0
+        self.touched = set()
+        self.checkpoint = options["checkpoint"]
+        done = self.read_checkpoint()
+        batch_size = options["batch_size"]
+        started = time.monotonic()
+        imported = 0
+        batch = []
+        with keep_dates():
+            for position, (number, record) in enumerate(
+                    self.read(options), 1):
+                if position <= done:
+                    continue
+                try:
+                    batch.append(self.clean(record))
+                except (TypeError, ValueError) as error:
+                    self.reject(number, f"некорректная запись ({error})")
+                if len(batch) >= batch_size:
+                    imported += self.import_batch(batch, position)
+                    self.report(position, imported, started)
+                    batch = []
+            if batch:
+                imported += self.import_batch(batch, position)
+        self.finish()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Импортировано постов: {imported}, пропущено: {self.skipped}, "
+            f"с ошибками: {self.errors}, за {elapsed:.1f} с"))
+
+    def read(self, options):
+        path = options["path"]
+        fmt = options["format"] or ("csv" if path.endswith(".csv")
+                                    else "jsonl")
+        if path == "-":
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+        else:
+            try:
+                stream = open(path, encoding="utf-8", newline="")
+            except OSError as error:
+                raise CommandError(error)
+        with stream:
+            if fmt == "csv":
+                reader = csv.DictReader(stream)
+                for record in reader:
+                    yield reader.line_num, record
+            else:
+                yield from self.read_jsonl(stream)
+
+    def read_jsonl(self, stream):
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                self.reject(number, f"некорректный JSON ({error})")
+                continue
+            if not isinstance(record, dict):
+                self.reject(number, "ожидается JSON-объект")
+                continue
+            yield number, record
+
+    def clean(self, record):
+        """Поля записи нужных типов; битая запись — TypeError/ValueError."""
+        fields = {key: record.get(key) or None
+                  for key in ("text", "author", "group")}
+        for key, value in fields.items():
+            if value is not None and not isinstance(value, str):
+                raise TypeError(f"{key}: ожидается строка, а не "
+                                f"{type(value).__name__}")
+        pub_date = record.get("pub_date") or None
+        if pub_date is not None:
+            # Несуществующая дата вроде 2021-13-45 — ValueError.
+            pub_date = parse_datetime(pub_date)
+            if pub_date is None:
+                raise ValueError("pub_date: ожидается дата ISO 8601")
+        return {**fields, "pub_date": pub_date}
+
+    def reject(self, number, reason):
+        self.errors += 1
+        self.stderr.write(f"Строка {number}: {reason}, пропущена")
+
+    def import_batch(self, records, position):
+        self.resolve(records)
+        now = timezone.now()
+        posts = []
+        for record in records:
+            author_id = self.authors.get(record["author"])
+            group_slug = record["group"]
+            group_id = self.groups.get(group_slug) if group_slug else None
+            if (not record["text"] or author_id is None
+                    or (group_slug and group_id is None)):
+                self.skipped += 1
+                continue
+            pub_date = record["pub_date"] or now
+            if timezone.is_naive(pub_date):
+                pub_date = timezone.make_aware(pub_date)
+            posts.append(Post(text=record["text"], author_id=author_id,
+                              group_id=group_id, pub_date=pub_date,
+                              updated_at=pub_date))
+        with transaction.atomic():
+            Post.objects.bulk_create(posts)
+            # bulk_create не шлёт сигналы, счётчики обновляются здесь же.
+            for counter, field in ((AuthorPostCounter, "author_id"),
+                                   (GroupPostCounter, "group_id")):
+                deltas = Counter(getattr(post, field) for post in posts)
+                for owner_id, delta in deltas.items():
+                    counter.adjust(owner_id, delta)
+            if self.checkpoint:
+                ImportCheckpoint.objects.update_or_create(
+                    name=self.checkpoint, defaults={"position": position})
+        self.touched.update((post.author_id, post.group_id)
+                            for post in posts)
+        return len(posts)
+
+    def resolve(self, records):
+        """Дополняет словари авторов и групп одним запросом на порцию."""
+        for lookup, key, model, field in (
+                (self.authors, "author", User, "username"),
+                (self.groups, "group", Group, "slug")):
+            wanted = {record.get(key) for record in records} - {None, ""}
+            missing = wanted - lookup.keys()
+            if not missing:
+                continue
+            lookup.update(model.objects.filter(**{f"{field}__in": missing})
+                          .values_list(field, "pk"))
+            if self.create_missing:
+                for value in missing - lookup.keys():
+                    defaults = {"title": value} if model is Group else {}
+                    lookup[value] = model.objects.get_or_create(
+                        **{field: value}, defaults=defaults)[0].pk
+
+    def finish(self):
+        cache.delete(INDEX_COUNT_KEY)
+        feeds = set()
+        for author_id, group_id in self.touched:
+            feeds.update(post_feeds(author_id, group_id))
+        bump_generations(*feeds)
+
+    def report(self, position, imported, started):
+        if self.verbosity < 1:
+            return
+        elapsed = time.monotonic() - started
+        self.stdout.write(f"Записей: {position}, импортировано: {imported}, "
+                          f"{imported / max(elapsed, 1e-6):.0f} постов/с")
+
+    def read_checkpoint(self):
+        if not self.checkpoint:
+            return 0
+        position = (ImportCheckpoint.objects.filter(name=self.checkpoint)
+                    .values_list("position", flat=True).first())
+        return position or 0
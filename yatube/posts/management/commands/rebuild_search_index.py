@@ -0,0 +1,123 @@
+from importlib import import_module
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from posts.search import fts_available
+
+search_index = import_module("posts.migrations.0008_post_search_index")
+
+NEW_TABLE = "posts_post_fts_new"
+PROGRESS_TABLE = "posts_post_fts_progress"
+# Пока индекс строится, изменения уже перенесённых постов (id не больше
+# отметки прогресса) зеркалятся в новую таблицу. Посты дальше отметки
+# прочитает следующая порция, так что в индекс они попадут один раз.
+DONE = f"(SELECT id FROM {PROGRESS_TABLE})"
+PREPARE_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE {NEW_TABLE} USING fts5(
+        text,
+        content='posts_post',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"CREATE TABLE {PROGRESS_TABLE} (id INTEGER NOT NULL)",
+    f"INSERT INTO {PROGRESS_TABLE} VALUES (0)",
+    f"""
+    CREATE TRIGGER {NEW_TABLE}_insert AFTER INSERT ON posts_post
+    WHEN new.id <= {DONE} BEGIN
+        INSERT INTO {NEW_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {NEW_TABLE}_delete AFTER DELETE ON posts_post
+    WHEN old.id <= {DONE} BEGIN
+        INSERT INTO {NEW_TABLE}({NEW_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {NEW_TABLE}_update AFTER UPDATE OF text ON posts_post
+    WHEN old.id <= {DONE} BEGIN
+        INSERT INTO {NEW_TABLE}({NEW_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO {NEW_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+]
+CLEANUP_SQL = [
+    f"DROP TRIGGER IF EXISTS {NEW_TABLE}_update",
+    f"DROP TRIGGER IF EXISTS {NEW_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {NEW_TABLE}_insert",
+    f"DROP TABLE IF EXISTS {PROGRESS_TABLE}",
+]
+
+
+class Command(BaseCommand):
+    help = ("Заново строит полнотекстовый индекс постов порциями в новой "
+            "таблице и подменяет ею старую одной транзакцией.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000,
+                            help="Сколько постов индексировать за транзакцию.")
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError("Полнотекстовый индекс есть только в SQLite.")
+        batch_size = options["batch_size"]
+        with connection.cursor() as cursor:
+            with transaction.atomic():
+                # Остатки прерванного запуска.
+                for sql in CLEANUP_SQL + [f"DROP TABLE IF EXISTS {NEW_TABLE}"]:
+                    cursor.execute(sql)
+                for sql in PREPARE_SQL:
+                    cursor.execute(sql)
+            # Старый индекс обслуживает поиск, пока строится новый.
+            total = 0
+            while True:
+                with transaction.atomic():
+                    indexed = self.index_batch(cursor, batch_size)
+                if indexed is None:
+                    break
+                total += indexed
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"Проиндексировано постов: {total}")
+            with transaction.atomic():
+                total += self.index_batch(cursor, None) or 0
+                self.swap(cursor)
+        self.stdout.write(self.style.SUCCESS(
+            f"Индекс построен, постов: {total}"))
+
+    def index_batch(self, cursor, batch_size):
+        """Переносит следующую порцию постов; None — переносить нечего.
+
+        Без batch_size переносится всё, что осталось.
+        """
+        cursor.execute(f"SELECT id FROM {PROGRESS_TABLE}")
+        last_id = cursor.fetchone()[0]
+        if batch_size is None:
+            cursor.execute("SELECT MAX(id) FROM posts_post WHERE id > %s",
+                           [last_id])
+        else:
+            cursor.execute("SELECT MAX(id) FROM (SELECT id FROM posts_post "
+                           "WHERE id > %s ORDER BY id LIMIT %s)",
+                           [last_id, batch_size])
+        upper = cursor.fetchone()[0]
+        if upper is None:
+            return None
+        cursor.execute(
+            f"INSERT INTO {NEW_TABLE}(rowid, text) SELECT id, text "
+            "FROM posts_post WHERE id > %s AND id <= %s", [last_id, upper])
+        indexed = cursor.rowcount
+        cursor.execute(f"UPDATE {PROGRESS_TABLE} SET id = %s", [upper])
+        return indexed
+
+    def swap(self, cursor):
+        """Подменяет старый индекс новым вместе с триггерами."""
+        for sql in CLEANUP_SQL + search_index.DROP_SQL:
+            cursor.execute(sql)
+        cursor.execute(f"ALTER TABLE {NEW_TABLE} RENAME TO posts_post_fts")
+        # Триггеры синхронизации — те же, что создаёт миграция.
+        for sql in search_index.CREATE_SQL[1:-1]:
+            cursor.execute(sql)
@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from posts.models import AuthorPostCounter, Group, GroupPostCounter, Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ("Сверяет счётчики постов авторов и групп с таблицей постов "
+            "и исправляет расхождения порциями.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000,
+                            help="Сколько авторов или групп за транзакцию.")
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        fixed = self.reconcile(User, AuthorPostCounter, "author", chunk_size)
+        fixed += self.reconcile(Group, GroupPostCounter, "group", chunk_size)
+        self.stdout.write(self.style.SUCCESS(
+            f"Исправлено счётчиков: {fixed}"))
+
+    def reconcile(self, owner_model, counter_model, field, chunk_size):
+        fixed = 0
+        last_pk = 0
+        while True:
+            owner_ids = list(
+                owner_model.objects.filter(pk__gt=last_pk).order_by("pk")
+                .values_list("pk", flat=True)[:chunk_size])
+            if not owner_ids:
+                return fixed
+            last_pk = owner_ids[-1]
+            with transaction.atomic():
+                fixed += self.reconcile_chunk(counter_model, field,
+                                              owner_ids)
+
+    def reconcile_chunk(self, counter_model, field, owner_ids):
+        actual = dict(
+            Post.objects.filter(**{f"{field}__in": owner_ids})
+            .order_by().values_list(field).annotate(Count("id")))
+        stored = dict(
+            counter_model.objects.select_for_update()
+            .filter(pk__in=owner_ids).values_list("pk", "posts_count"))
+        changed = [
+            counter_model(pk=owner_id, posts_count=actual.get(owner_id, 0))
+            for owner_id in owner_ids
+            if owner_id in stored
+            and stored[owner_id] != actual.get(owner_id, 0)
+        ]
+        missing = [
+            counter_model(pk=owner_id, posts_count=actual[owner_id])
+            for owner_id in owner_ids
+            if owner_id in actual and owner_id not in stored
+        ]
+        counter_model.objects.bulk_update(changed, ["posts_count"])
+        counter_model.objects.bulk_create(missing)
+        return len(changed) + len(missing)
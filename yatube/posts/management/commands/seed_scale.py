@@ -0,0 +1,119 @@
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from posts.feed_cache import bump_generations
+from posts.models import AuthorPostCounter, Group, GroupPostCounter, Post
+from posts.paginators import INDEX_COUNT_KEY
+from posts.utils import keep_dates
+
+User = get_user_model()
+
+SEED_PASSWORD = "seed-password"
+# Тексты постов берутся из пула: mixer на каждый из миллионов постов
+# работал бы десятки минут.
+TEXT_POOL_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = ("Заполняет базу синтетическими данными для нагрузочного "
+            "тестирования: авторы, группы и посты через mixer. "
+            f"У всех авторов пароль {SEED_PASSWORD!r}.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--authors", type=int, default=5000)
+        parser.add_argument("--groups", type=int, default=1000)
+        parser.add_argument("--posts", type=int, default=1000000)
+        parser.add_argument("--days", type=int, default=3 * 365,
+                            help="За сколько дней распределить pub_date.")
+        parser.add_argument("--group-share", type=float, default=0.7,
+                            help="Доля постов, опубликованных в группе.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--prefix", default="seed")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        self.mixer = Mixer(commit=False)
+        self.random = random.Random(options["seed"])
+        prefix = options["prefix"]
+        started = time.monotonic()
+        authors = self.seed_authors(prefix, options["authors"])
+        groups = self.seed_groups(prefix, options["groups"])
+        created = self.seed_posts(authors, groups, options, started)
+        cache.delete(INDEX_COUNT_KEY)
+        bump_generations("index", *(f"author:{pk}" for pk in authors),
+                         *(f"group:{pk}" for pk in groups))
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Авторов: {len(authors)}, групп: {len(groups)}, "
+            f"постов: {created} за {elapsed:.1f} с"))
+
+    def seed_authors(self, prefix, count):
+        password = make_password(SEED_PASSWORD)
+        users = (self.mixer.blend(User, username=f"{prefix}_user_{i}",
+                                  password=password, is_staff=False,
+                                  is_superuser=False)
+                 for i in range(count))
+        User.objects.bulk_create(users, batch_size=1000,
+                                 ignore_conflicts=True)
+        return list(User.objects.filter(username__startswith=f"{prefix}_user_")
+                    .values_list("pk", flat=True))
+
+    def seed_groups(self, prefix, count):
+        groups = (self.mixer.blend(Group, slug=f"{prefix}-group-{i}")
+                  for i in range(count))
+        Group.objects.bulk_create(groups, batch_size=1000,
+                                  ignore_conflicts=True)
+        return list(Group.objects.filter(slug__startswith=f"{prefix}-group-")
+                    .values_list("pk", flat=True))
+
+    def seed_posts(self, authors, groups, options, started):
+        texts = [self.mixer.faker.text(self.random.choice((80, 200, 600)))
+                 for _ in range(TEXT_POOL_SIZE)]
+        total, batch_size = options["posts"], options["batch_size"]
+        now = timezone.now()
+        span = options["days"] * 24 * 60 * 60
+        created = 0
+        with keep_dates():
+            while created < total:
+                size = min(batch_size, total - created)
+                posts = []
+                for _ in range(size):
+                    pub_date = now - timedelta(
+                        seconds=self.random.randrange(span or 1))
+                    in_group = (groups and self.random.random()
+                                < options["group_share"])
+                    posts.append(Post(
+                        text=self.random.choice(texts),
+                        author_id=self.random.choice(authors),
+                        group_id=(self.random.choice(groups)
+                                  if in_group else None),
+                        pub_date=pub_date, updated_at=pub_date))
+                self.insert(posts)
+                created += size
+                if self.verbosity > 1:
+                    elapsed = time.monotonic() - started
+                    self.stdout.write(
+                        f"Постов: {created}/{total}, "
+                        f"{created / max(elapsed, 1e-6):.0f} постов/с")
+        return created
+
+    def insert(self, posts):
+        with transaction.atomic():
+            Post.objects.bulk_create(posts)
+            # Как и import_posts: bulk_create не шлёт сигналы.
+            for counter, field in ((AuthorPostCounter, "author_id"),
+                                   (GroupPostCounter, "group_id")):
+                deltas = Counter(getattr(post, field) for post in posts)
+                for owner_id, delta in deltas.items():
+                    counter.adjust(owner_id, delta)
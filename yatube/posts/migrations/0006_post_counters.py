@@ -0,0 +1,51 @@
+# Generated by Django 2.2.16 on 2026-10-18 16:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    for counter_name, field in (('AuthorPostCounter', 'author'),
+                                ('GroupPostCounter', 'group')):
+        Counter = apps.get_model('posts', counter_name)
+        rows = (Post.objects.filter(**{f'{field}__isnull': False})
+                .order_by().values(field)
+                .annotate(total=models.Count('id')))
+        Counter.objects.bulk_create(
+            (Counter(pk=row[field], posts_count=row['total']) for row in rows),
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0005_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorPostCounter',
+            fields=[
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Число постов')),
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='post_counter', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='GroupPostCounter',
+            fields=[
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Число постов')),
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='post_counter', serialize=False, to='posts.Group', verbose_name='Группа')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
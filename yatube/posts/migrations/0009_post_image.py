@@ -0,0 +1,36 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:05
+
+from importlib import import_module
+
+from django.db import migrations
+import sorl.thumbnail.fields
+
+search_index = import_module('posts.migrations.0008_post_search_index')
+
+
+def restore_search_triggers(apps, schema_editor):
+    # На SQLite AddField/RemoveField пересоздают таблицу posts_post,
+    # а вместе со старой таблицей пропадают и её триггеры FTS.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in search_index.DROP_SQL[:3] + search_index.CREATE_SQL[1:4]:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_post_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop,
+                             restore_search_triggers),
+        migrations.AddField(
+            model_name='post',
+            name='image',
+            field=sorl.thumbnail.fields.ImageField(blank=True, help_text='Необязательно', upload_to='posts/', verbose_name='Картинка'),
+        ),
+        migrations.RunPython(restore_search_triggers,
+                             migrations.RunPython.noop),
+    ]
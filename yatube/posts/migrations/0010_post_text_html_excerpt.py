@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:20
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+post_image = import_module('posts.migrations.0009_post_image')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_image'),
+    ]
+
+    # Строки заполняет команда backfill_post_html порциями, а не миграция:
+    # так миграция не держит таблицу на время рендера всех постов.
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop,
+                             post_image.restore_search_triggers),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=300, verbose_name='Анонс'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='HTML текста'),
+        ),
+        migrations.RunPython(post_image.restore_search_triggers,
+                             migrations.RunPython.noop),
+    ]
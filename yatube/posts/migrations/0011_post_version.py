@@ -0,0 +1,26 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:40
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+post_image = import_module('posts.migrations.0009_post_image')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_text_html_excerpt'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop,
+                             post_image.restore_search_triggers),
+        migrations.AddField(
+            model_name='post',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='Версия'),
+        ),
+        migrations.RunPython(post_image.restore_search_triggers,
+                             migrations.RunPython.noop),
+    ]
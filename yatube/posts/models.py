@@ -1,8 +1,16 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.template.defaultfilters import linebreaksbr
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
+from sorl.thumbnail import ImageField
+
+from .routes import post_route
 
 User = get_user_model()
 
+EXCERPT_LENGTH = 300
+
 
 class Group(models.Model):
     title = models.CharField("Заголовок", max_length=200)
@@ -12,19 +20,189 @@ class Group(models.Model):
     def __str__(self) -> str:
         return self.title
 
+    def get_absolute_url(self):
+        return post_route("slug", self.slug)
+
+
+class EditConflict(Exception):
+    """Пост изменили после того, как его открыли на редактирование."""
+
+
+class PostQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create не вызывает save(), HTML и анонс считаются здесь.
+        objs = list(objs)
+        for post in objs:
+            post.render_text()
+        return super().bulk_create(objs, *args, **kwargs)
+
 
 class Post(models.Model):
     text = models.TextField("Текст поста", help_text="Введите текст поста")
     pub_date = models.DateTimeField("Дата публикации", auto_now_add=True)
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True,
+                                      db_index=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE,
                                related_name="posts", verbose_name="Автор")
     group = models.ForeignKey(Group, on_delete=models.CASCADE,
                               related_name="posts", verbose_name="Группа",
                               blank=True, null=True,
                               help_text="Выберите группу")
+    image = ImageField("Картинка", upload_to="posts/", blank=True,
+                       help_text="Необязательно")
+    text_html = models.TextField("HTML текста", blank=True, editable=False)
+    excerpt = models.CharField("Анонс", max_length=EXCERPT_LENGTH,
+                               blank=True, editable=False)
+
+    version = models.PositiveIntegerField("Версия", default=1,
+                                          editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ["-pub_date"]
+        indexes = [
+            models.Index(fields=["group", "pub_date", "id"],
+                         name="posts_post_group_feed_idx"),
+            models.Index(fields=["author", "pub_date", "id"],
+                         name="posts_post_author_feed_idx"),
+            models.Index(fields=["pub_date", "id"],
+                         name="posts_post_feed_idx"),
+            models.Index(fields=["group", "updated_at"],
+                         name="posts_post_group_updated_idx"),
+            models.Index(fields=["author", "updated_at"],
+                         name="posts_post_author_updated_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.text
+
+    def get_absolute_url(self):
+        return post_route("post_detail", self.pk)
+
+    def get_edit_url(self):
+        return post_route("post_edit", self.pk)
+
+    def get_author_url(self):
+        return post_route("profile", self.author.username)
+
+    @property
+    def rendered_text(self):
+        """Готовый HTML текста, для старых строк — рендер на лету."""
+        if self.text_html:
+            return mark_safe(self.text_html)
+        return linebreaksbr(self.text, autoescape=True)
+
+    @property
+    def feed_text(self):
+        """Анонс для лент; текст дочитывается только до бэкфилла."""
+        return self.excerpt or Truncator(self.text).chars(EXCERPT_LENGTH)
+
+    def render_text(self):
+        """Заполняет text_html и excerpt по тексту поста."""
+        self.text_html = linebreaksbr(self.text, autoescape=True)
+        self.excerpt = Truncator(self.text).chars(EXCERPT_LENGTH)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "text" in update_fields:
+            self.render_text()
+        if update_fields is not None:
+            update_fields = {*update_fields, "version"}
+            if "text" in update_fields:
+                update_fields |= {"text_html", "excerpt"}
+            kwargs["update_fields"] = update_fields
+        # Любая запись делает устаревшими открытые формы редактирования.
+        # Без проверки версии она увеличивается в самом UPDATE: устаревший
+        # экземпляр не запишет в базу номер, который там уже был.
+        loaded_version = self.version
+        expected = getattr(self, "_expected_version", None)
+        in_sql = not self._state.adding and expected is None
+        if in_sql:
+            self.version = models.F("version") + 1
+        elif not self._state.adding:
+            self.version = expected + 1
+        # Счётчики постов обновляются в post_save, поэтому сохранение
+        # вместе с ними выполняется в одной транзакции.
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                if in_sql:
+                    self.refresh_from_db(using=self._state.db,
+                                         fields=["version"])
+        except Exception:
+            self.version = loaded_version
+            raise
+
+    def save_changes(self, fields, version):
+        """Записывает только fields, если в базе всё ещё версия version.
+
+        Это один UPDATE ... WHERE id = ... AND version = ... без
+        блокировки строки. Если пост успели изменить или удалить,
+        бросает EditConflict, и post_save не срабатывает.
+        """
+        self._expected_version = version
+        try:
+            self.save(update_fields={*fields, "updated_at"})
+        finally:
+            del self._expected_version
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields,
+                   forced_update):
+        expected = getattr(self, "_expected_version", None)
+        if expected is None:
+            return super()._do_update(base_qs, using, pk_val, values,
+                                      update_fields, forced_update)
+        updated = super()._do_update(base_qs.filter(version=expected), using,
+                                     pk_val, values, update_fields,
+                                     forced_update)
+        if not updated:
+            raise EditConflict(self.pk)
+        return updated
+
+
+class PostCounter(models.Model):
+    """Денормализованное число постов, чтобы не делать COUNT(*)."""
+
+    posts_count = models.PositiveIntegerField("Число постов", default=0)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def adjust(cls, owner_id, delta):
+        if owner_id is None:
+            return
+        updated = cls.objects.filter(pk=owner_id).update(
+            posts_count=models.F("posts_count") + delta)
+        if not updated and delta > 0:
+            cls.objects.create(pk=owner_id, posts_count=delta)
+
+
+class AuthorPostCounter(PostCounter):
+    author = models.OneToOneField(User, on_delete=models.CASCADE,
+                                  primary_key=True,
+                                  related_name="post_counter",
+                                  verbose_name="Автор")
+
+
+class GroupPostCounter(PostCounter):
+    group = models.OneToOneField(Group, on_delete=models.CASCADE,
+                                 primary_key=True,
+                                 related_name="post_counter",
+                                 verbose_name="Группа")
+
+
+class ImportCheckpoint(models.Model):
+    """Сколько записей источника уже импортировал import_posts.
+
+    Пишется в той же транзакции, что и порция постов, поэтому сбой
+    между ними не приводит к повторному импорту порции.
+    """
+
+    name = models.CharField("Имя", max_length=255, unique=True)
+    position = models.PositiveIntegerField("Обработано записей", default=0)
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.position}"
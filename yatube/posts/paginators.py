@@ -0,0 +1,179 @@
+import base64
+
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db.models import Max
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+INDEX_COUNT_KEY = "posts:count:index"
+COUNT_CACHE_TIMEOUT = 60 * 60
+# Выше этого порога главная лента берёт оценку max(id) вместо COUNT(*).
+APPROXIMATE_COUNT_THRESHOLD = 100000
+
+
+def encode_cursor(post):
+    """Упаковывает позицию поста (pub_date, id) в непрозрачный токен."""
+    raw = f"{post.pub_date.isoformat()}|{post.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Распаковывает токен курсора, для мусора возвращает None."""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        pub_date, pk = raw.rsplit("|", 1)
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        return None
+    if pub_date is None:
+        return None
+    return pub_date, pk
+
+
+class WindowedPage(Page):
+    """Страница с окном навигации: первая, последняя и соседи текущей."""
+
+    @property
+    def page_window(self):
+        """Номера страниц для ссылок, None на месте пропуска."""
+        window = self.paginator.window
+        last = self.paginator.num_pages
+        start = max(self.number - window, 1)
+        end = min(self.number + window, last)
+        pages = list(range(start, end + 1))
+        if start > 1:
+            pages = [1] + ([None] if start > 2 else []) + pages
+        if end < last:
+            pages += ([None] if end < last - 1 else []) + [last]
+        return pages
+
+
+class CachedCountPaginator(Paginator):
+    """Паджинатор, который не считает COUNT(*) на каждый запрос.
+
+    Число объектов берётся из get_count (например, из счётчиков
+    постов), из кэша по count_key, а для огромной таблицы —
+    приблизительно по max(id).
+    """
+
+    def __init__(self, object_list, per_page, count_key=None,
+                 get_count=None, window=2, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+        self.get_count = get_count
+        self.window = window
+
+    @cached_property
+    def count(self):
+        if self.get_count is not None:
+            return self.get_count()
+        if self.count_key is None:
+            return super().count
+        count = cache.get(self.count_key)
+        if count is None:
+            count = self.estimate_count()
+            cache.set(self.count_key, count, COUNT_CACHE_TIMEOUT)
+        return count
+
+    def estimate_count(self):
+        estimate = self.object_list.aggregate(max_id=Max("id"))["max_id"]
+        if estimate is None:
+            return 0
+        if estimate < APPROXIMATE_COUNT_THRESHOLD:
+            return self.object_list.count()
+        return estimate
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+
+class CursorPage(Page):
+    """Страница, совместимая с Page, но без номера и общего счётчика."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        super().__init__(object_list, None, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return "<Cursor page>"
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def next_page_number(self):
+        return None
+
+    def previous_page_number(self):
+        return None
+
+    def start_index(self):
+        return None
+
+    def end_index(self):
+        return None
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return encode_cursor(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return encode_cursor(self.object_list[0])
+        return None
+
+
+class CursorPaginator(CachedCountPaginator):
+    """Паджинатор ленты постов по ключу (pub_date, id).
+
+    Обычный get_page(number) продолжает работать для старых ссылок
+    вида ?page=N, а get_cursor_page() выбирает страницу по индексу
+    без COUNT(*) и OFFSET, поэтому глубокие страницы стоят столько же,
+    сколько первая.
+    """
+
+    ordering = ("-pub_date", "-id")
+
+    def __init__(self, object_list, per_page, **kwargs):
+        super().__init__(object_list.order_by(*self.ordering), per_page,
+                         **kwargs)
+
+    def get_cursor_page(self, after=None, before=None):
+        after = decode_cursor(after)
+        before = None if after else decode_cursor(before)
+        limit = self.per_page + 1
+        if after:
+            pub_date, pk = after
+            # Условие по курсору записано как диапазон pub_date с
+            # исключением границы, а не через OR: так SQLite ищет по
+            # индексу, а не сканирует.
+            rows = list(self.object_list.filter(pub_date__lte=pub_date)
+                        .exclude(pub_date=pub_date, id__gte=pk)[:limit])
+            return CursorPage(rows[:self.per_page], self,
+                              has_next=len(rows) == limit,
+                              has_previous=True)
+        if before:
+            pub_date, pk = before
+            rows = list(self.object_list.filter(pub_date__gte=pub_date)
+                        .exclude(pub_date=pub_date, id__lte=pk)
+                        .reverse()[:limit])
+            return CursorPage(rows[:self.per_page][::-1], self,
+                              has_next=True,
+                              has_previous=len(rows) == limit)
+        rows = list(self.object_list[:limit])
+        return CursorPage(rows[:self.per_page], self,
+                          has_next=len(rows) == limit,
+                          has_previous=False)
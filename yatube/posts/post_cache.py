@@ -0,0 +1,125 @@
+"""Кэш снимков постов в памяти воркера для страницы поста.
+
+Снимок — пост вместе с автором, счётчиком его постов и группой, то
+есть всё, что выводит post_detail. Версия снимка — поколения лент
+"post:<id>" и "author:<id>" из общего кэша: сигналы сдвигают их при
+правке и удалении поста и при новом посте автора, так что проверка
+свежести в любом воркере стоит один get_many. TTL ограничивает
+устаревание, если версия разошлась с базой (например, снимок прочитан
+с отстающей реплики). Снимки общие для запросов воркера — только для
+чтения.
+"""
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .feed_cache import get_generation, get_generations
+
+stats = Counter()
+
+_snapshots = None
+
+
+class SnapshotCache:
+    """LRU на OrderedDict: ключ — id поста, значение — запись о снимке."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, post_id):
+        with self._lock:
+            entry = self._entries.get(post_id)
+            if entry is not None:
+                self._entries.move_to_end(post_id)
+            return entry
+
+    def put(self, post_id, post, versions):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[post_id] = (post, versions,
+                                      time.monotonic() + self.ttl)
+            self._entries.move_to_end(post_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                stats["evictions"] += 1
+
+    def discard(self, post_id):
+        with self._lock:
+            self._entries.pop(post_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def get_snapshots():
+    global _snapshots
+    if _snapshots is None:
+        _snapshots = SnapshotCache(settings.POST_CACHE_SIZE,
+                                   settings.POST_CACHE_TTL)
+    return _snapshots
+
+
+@receiver(setting_changed)
+def reset_snapshots(setting, **kwargs):
+    global _snapshots
+    if setting in ("POST_CACHE_SIZE", "POST_CACHE_TTL"):
+        _snapshots = None
+
+
+def snapshot_feeds(post):
+    return f"post:{post.pk}", f"author:{post.author_id}"
+
+
+def get_post(post_id, load, fresh=False):
+    """Снимок поста из памяти воркера или load(); None, если поста нет.
+
+    fresh=True пропускает чтение из кэша (пользователь только что
+    писал), но свежий снимок всё равно кладётся в кэш.
+    """
+    snapshots = get_snapshots()
+    entry = None if fresh else snapshots.get(post_id)
+    if entry is not None:
+        post, versions, expires = entry
+        if time.monotonic() >= expires:
+            stats["expired"] += 1
+        elif get_generations(*snapshot_feeds(post)) == versions:
+            stats["hits"] += 1
+            return post
+        else:
+            stats["stale"] += 1
+    stats["misses"] += 1
+    # Поколение поста читается до загрузки: правка, закоммиченная
+    # между ними, сдвинет его ещё раз, и снимок не сойдёт за свежий.
+    post_version = get_generation(f"post:{post_id}")
+    post = load()
+    if post is None:
+        snapshots.discard(post_id)
+        return None
+    author_version = get_generation(snapshot_feeds(post)[1])
+    snapshots.put(post_id, post, (post_version, author_version))
+    return post
+
+
+def metrics():
+    """Счётчики кэша этого воркера и доля попаданий."""
+    snapshots = get_snapshots()
+    lookups = stats["hits"] + stats["misses"]
+    return {
+        "size": len(snapshots),
+        "max_size": snapshots.max_size,
+        **{name: stats[name] for name in
+           ("hits", "misses", "stale", "expired", "evictions")},
+        "hit_rate": stats["hits"] / lookups if lookups else None,
+    }
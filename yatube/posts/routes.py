@@ -0,0 +1,30 @@
+from functools import lru_cache
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import get_script_prefix, get_urlconf, reverse
+
+# Хватает на первые страницы всех активных лент; остальное вытесняется.
+ROUTE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=ROUTE_CACHE_SIZE)
+def _reverse(script_prefix, urlconf, name, args):
+    return reverse(name, args=args, urlconf=urlconf)
+
+
+def post_route(name, *args):
+    """reverse("posts:<name>", args) с запоминанием результата.
+
+    В ленте каждый пост даёт три-четыре ссылки, а reverse() каждый раз
+    проходит резолвер. Ключ включает префикс скрипта и urlconf запроса,
+    так что кэш не путает разные точки монтирования.
+    """
+    return _reverse(get_script_prefix(), get_urlconf(), f"posts:{name}",
+                    args)
+
+
+@receiver(setting_changed)
+def clear_routes(setting, **kwargs):
+    if setting == "ROOT_URLCONF":
+        _reverse.cache_clear()
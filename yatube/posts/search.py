@@ -0,0 +1,138 @@
+import base64
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+from .paginators import CursorPage
+
+SNIPPET_TOKENS = 16
+# Символы, которых нет в тексте постов: ими snippet() отмечает совпадения
+# до экранирования HTML.
+MARK_START, MARK_END = "\x02", "\x03"
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_available():
+    return connection.vendor == "sqlite"
+
+
+def build_match(query):
+    """Превращает пользовательский ввод в безопасный запрос FTS5.
+
+    Каждое слово берётся в кавычки, так что операторы и спецсимволы
+    FTS5 из ввода не интерпретируются; слова объединяются через AND,
+    последнее ищется по префиксу.
+    """
+    words = WORD_RE.findall(query or "")
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def matching_ids(query):
+    """Подзапрос id постов для фильтра queryset, например в админке."""
+    return RawSQL(
+        "SELECT rowid FROM posts_post_fts WHERE posts_post_fts MATCH %s",
+        (build_match(query),),
+    )
+
+
+def encode_cursor(rank, post_id):
+    raw = f"{rank!r}|{post_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        rank, post_id = base64.urlsafe_b64decode(
+            padded.encode()).decode().rsplit("|", 1)
+        return float(rank), int(post_id)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        return None
+
+
+def highlight(snippet):
+    html = escape(snippet)
+    return mark_safe(html.replace(MARK_START, "<mark>")
+                     .replace(MARK_END, "</mark>"))
+
+
+class SearchPage(CursorPage):
+    """Страница результатов поиска с курсором по (rank, id)."""
+
+    @property
+    def next_cursor(self):
+        if self.has_next() and self.object_list:
+            post = self.object_list[-1]
+            return encode_cursor(post.search_rank, post.pk)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous() and self.object_list:
+            post = self.object_list[0]
+            return encode_cursor(post.search_rank, post.pk)
+        return None
+
+
+def search_posts(query, per_page, after=None, before=None):
+    """Ищет посты по индексу FTS5, лучшие совпадения первыми.
+
+    У найденных постов заполнены search_rank и search_snippet
+    с подсвеченными совпадениями.
+    """
+    match = build_match(query)
+    if match is None:
+        return SearchPage([], None, has_next=False, has_previous=False)
+    after = decode_cursor(after)
+    before = None if after else decode_cursor(before)
+    where, params, order = "", [match], "f.rank, f.rowid"
+    if after:
+        where = "AND (f.rank > %s OR (f.rank = %s AND f.rowid > %s))"
+        params += [after[0], after[0], after[1]]
+    elif before:
+        where = "AND (f.rank < %s OR (f.rank = %s AND f.rowid < %s))"
+        params += [before[0], before[0], before[1]]
+        order = "f.rank DESC, f.rowid DESC"
+    params.append(per_page + 1)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT f.rowid, f.rank,
+                   snippet(posts_post_fts, 0, %s, %s, '…', %s)
+            FROM posts_post_fts AS f
+            WHERE posts_post_fts MATCH %s {where}
+            ORDER BY {order}
+            LIMIT %s
+            """,
+            [MARK_START, MARK_END, SNIPPET_TOKENS] + params,
+        )
+        rows = cursor.fetchall()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if before:
+        rows.reverse()
+    posts = Post.objects.select_related("author", "group").in_bulk(
+        [row[0] for row in rows])
+    results = []
+    for post_id, rank, snippet in rows:
+        post = posts.get(post_id)
+        if post is None:
+            continue
+        post.search_rank = rank
+        post.search_snippet = highlight(snippet)
+        results.append(post)
+    return SearchPage(
+        results, None,
+        has_next=has_more if not before else True,
+        has_previous=bool(after) or (bool(before) and has_more),
+    )
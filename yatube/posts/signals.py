@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .feed_cache import bump_generations, post_feeds
+from .live import notify_new_post
+from .models import AuthorPostCounter, GroupPostCounter, Post
+from .paginators import INDEX_COUNT_KEY
+
+
+def forget_index_count():
+    transaction.on_commit(lambda: cache.delete(INDEX_COUNT_KEY))
+
+
+@receiver(post_init, sender=Post)
+def remember_counted_owners(sender, instance, **kwargs):
+    """Запоминает автора и группу, по которым пост уже посчитан."""
+    # Через __dict__, чтобы не подгружать отложенные через defer() поля.
+    instance._counted_owners = (instance.__dict__.get("author_id"),
+                                instance.__dict__.get("group_id"))
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    author_id, group_id = instance.author_id, instance.group_id
+    if created:
+        AuthorPostCounter.adjust(author_id, 1)
+        GroupPostCounter.adjust(group_id, 1)
+        forget_index_count()
+        transaction.on_commit(lambda: notify_new_post(instance.pk))
+    else:
+        old_author_id, old_group_id = instance._counted_owners
+        if old_author_id != author_id:
+            AuthorPostCounter.adjust(old_author_id, -1)
+            AuthorPostCounter.adjust(author_id, 1)
+        if old_group_id != group_id:
+            GroupPostCounter.adjust(old_group_id, -1)
+            GroupPostCounter.adjust(group_id, 1)
+    bump_generations(*post_feeds(author_id, group_id),
+                     *post_feeds(*instance._counted_owners),
+                     f"post:{instance.pk}")
+    instance._counted_owners = (author_id, group_id)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    author_id, group_id = instance._counted_owners
+    AuthorPostCounter.adjust(author_id, -1)
+    GroupPostCounter.adjust(group_id, -1)
+    forget_index_count()
+    bump_generations(*post_feeds(author_id, group_id), f"post:{instance.pk}")
@@ -0,0 +1,77 @@
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest
+from django.urls import resolve
+
+from core.tasks import enqueue, task
+
+from .feed_cache import (finish_refreshing, forced_render, mark_refreshing,
+                         stats)
+from .images import generate_renditions
+from .models import Group, Post, User
+from .routes import post_route
+
+
+def feed_path(feed):
+    """URL первой страницы ленты index, author:<id>, group:<id>, post:<id>."""
+    kind, _, owner_id = feed.partition(":")
+    if kind == "index":
+        return post_route("index")
+    if kind == "post":
+        exists = Post.objects.filter(pk=owner_id).exists()
+        return exists and post_route("post_detail", int(owner_id))
+    if kind == "author":
+        username = User.objects.filter(pk=owner_id).values_list(
+            "username", flat=True).first()
+        return username and post_route("profile", username)
+    slug = Group.objects.filter(pk=owner_id).values_list(
+        "slug", flat=True).first()
+    return slug and post_route("slug", slug)
+
+
+def render_anonymously(path):
+    request = HttpRequest()
+    request.method = "GET"
+    request.path = request.path_info = path
+    request.META = {"SERVER_NAME": "localhost", "SERVER_PORT": "80"}
+    request.user = AnonymousUser()
+    request.resolver_match = resolve(path)
+    match = request.resolver_match
+    return match.func(request, *match.args, **match.kwargs)
+
+
+@task(max_attempts=3)
+def warm_feeds(feeds):
+    """Перерисовывает первые страницы лент и кладёт их в кэш.
+
+    До конца прогрева читатели получают прошлую версию страниц.
+    """
+    with forced_render():
+        for feed in feeds:
+            path = feed_path(feed)
+            if path:
+                render_anonymously(path)
+                stats["warmed"] += 1
+    finish_refreshing(feeds)
+
+
+@task(max_attempts=3)
+def render_post_images(post_id, feeds):
+    """Готовит рендишены картинки поста, затем прогревает страницы."""
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None and post.image:
+        generate_renditions(post.image)
+    warm_feeds(feeds)
+
+
+def refresh_pages(feeds, new_image_post=None):
+    """Помечает страницы как обновляемые и ставит их прогрев в очередь.
+
+    Если у поста новая картинка, прогрев идёт после её рендишенов,
+    иначе в кэш попала бы страница со ссылкой на оригинал.
+    """
+    feeds = sorted(feeds)
+    mark_refreshing(feeds)
+    if new_image_post is not None:
+        enqueue(render_post_images, new_image_post.pk, feeds)
+    else:
+        enqueue(warm_feeds, feeds)
@@ -0,0 +1,44 @@
+from django import template
+
+from core.replicas import is_pinned
+from posts.feed_cache import get_fragment
+
+register = template.Library()
+
+
+class FeedCacheNode(template.Node):
+    def __init__(self, nodelist, feed, owner):
+        self.nodelist = nodelist
+        self.feed = feed
+        self.owner = owner
+
+    def render(self, context):
+        feed = self.feed.resolve(context)
+        if self.owner is not None:
+            feed = f"{feed}:{self.owner.resolve(context)}"
+        # В ленте ключ строится по странице, на странице поста — по посту.
+        page = context.get("page_obj")
+        posts = page if page is not None else [context["post"]]
+        first_page = page is None or not page.has_previous()
+        # Только что писавший автор всегда видит свежую версию.
+        request = context.get("request")
+        allow_stale = request is None or not is_pinned(request)
+        return get_fragment(feed, posts,
+                            lambda: self.nodelist.render(context),
+                            first_page=first_page, allow_stale=allow_stale)
+
+
+@register.tag
+def feed_cache(parser, token):
+    """Кэширует список постов страницы ленты.
+
+    {% feed_cache "group" group.pk %}...{% endfeed_cache %}
+    """
+    bits = token.split_contents()
+    if len(bits) not in (2, 3):
+        raise template.TemplateSyntaxError(
+            f"{bits[0]} принимает имя ленты и, возможно, её владельца")
+    nodelist = parser.parse(("endfeed_cache",))
+    parser.delete_first_token()
+    owner = parser.compile_filter(bits[2]) if len(bits) == 3 else None
+    return FeedCacheNode(nodelist, parser.compile_filter(bits[1]), owner)
@@ -0,0 +1,15 @@
+from django import template
+
+from posts.images import rendition
+
+register = template.Library()
+
+
+@register.inclusion_tag("posts/includes/post_image.html")
+def post_image(post, kind="feed"):
+    """<img> поста с srcset и ленивой загрузкой.
+
+    {% post_image post "detail" %}
+    """
+    return {"image": rendition(post.image, kind), "alt": post.feed_text[:80],
+            "lazy": kind == "feed"}
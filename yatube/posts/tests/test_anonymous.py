@@ -0,0 +1,61 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+# Чтение сессии и пользователя из сессии; выборки авторов для ленты
+# сюда не попадают.
+SESSION_QUERIES = ('"django_session"',
+                   'FROM "auth_user" WHERE "auth_user"."id" =')
+
+
+class AnonymousFastPathTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="Test")
+        cls.group = Group.objects.create(title="Группа", slug="group")
+        cls.post = Post.objects.create(author=cls.user, group=cls.group,
+                                       text="Тестовый пост")
+
+    def session_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [query["sql"] for query in context.captured_queries
+                if any(part in query["sql"] for part in SESSION_QUERIES)]
+
+    def urls(self):
+        return (reverse("posts:index"),
+                reverse("posts:post_detail", args=[self.post.pk]),
+                reverse("posts:slug", args=[self.group.slug]),
+                reverse("posts:profile", args=[self.user.username]))
+
+    def test_no_session_or_auth_queries_without_cookie(self):
+        for url in self.urls():
+            with self.subTest(url=url):
+                self.assertEqual(self.session_queries(url), [])
+
+    def test_no_session_or_auth_queries_with_anonymous_session(self):
+        SessionStore = import_module(settings.SESSION_ENGINE).SessionStore
+        session = SessionStore()
+        session["seen"] = True
+        session.save()
+        self.client.cookies["sessionid"] = session.session_key
+        for url in self.urls():
+            with self.subTest(url=url):
+                self.assertEqual(self.session_queries(url), [])
+        self.assertTrue(SessionStore(session.session_key).exists(
+            session.session_key))
+
+    def test_logged_in_user_is_still_recognised(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("posts:index"))
+        self.assertContains(response, reverse("posts:post_create"))
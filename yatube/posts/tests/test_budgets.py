@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+
+from posts import urls
+from posts.budgets import get_query_budget
+from posts.models import Group, Post
+from posts.tests.utils import QueryBudgetMixin
+
+User = get_user_model()
+
+USERNAME = "Test"
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(
+            title="test-group",
+            slug="test-slug",
+        )
+        cls.post = Post.objects.create(
+            text="Тестовый текст",
+            author=cls.user,
+            group=cls.group
+        )
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    def feed_pages(self):
+        return (
+            ("posts:index", ()),
+            ("posts:slug", (self.group.slug,)),
+            ("posts:profile", (USERNAME,)),
+        )
+
+    def test_every_url_has_budget(self):
+        args = {
+            "slug": (self.group.slug,),
+            "group_export": (self.group.slug,),
+            "profile": (USERNAME,),
+            "profile_export": (USERNAME,),
+            "post_detail": (self.post.pk,),
+            "post_edit": (self.post.pk,),
+            "posts_since": (0,),
+        }
+        for pattern in urls.urlpatterns:
+            with self.subTest(name=pattern.name):
+                self.assertIsNotNone(get_query_budget(
+                    f"posts:{pattern.name}", *args.get(pattern.name, ())))
+
+    def test_pages_within_budget(self):
+        pages = self.feed_pages() + (
+            ("posts:post_detail", (self.post.pk,)),
+            ("posts:post_create", ()),
+            ("posts:post_edit", (self.post.pk,)),
+        )
+        for url_name, args in pages:
+            for client in (self.client, self.authorized_client):
+                with self.subTest(url_name=url_name):
+                    self.assertQueryBudget(client, url_name, *args)
+
+    def test_feed_queries_do_not_grow_with_posts(self):
+        """Число запросов ленты не зависит от числа постов на странице."""
+        before = {
+            url_name: self.assertQueryBudget(
+                self.authorized_client, url_name, *args)[1]
+            for url_name, args in self.feed_pages()
+        }
+        other = User.objects.create_user(username="other")
+        Post.objects.bulk_create(
+            Post(author=author, group=self.group, text="текст")
+            for author in (self.user, other) * 5
+        )
+        for url_name, args in self.feed_pages():
+            with self.subTest(url_name=url_name):
+                _, count = self.assertQueryBudget(
+                    self.authorized_client, url_name, *args)
+                self.assertEqual(count, before[url_name])
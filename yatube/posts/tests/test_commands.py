@@ -0,0 +1,199 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from posts.models import (AuthorPostCounter, Group, GroupPostCounter,
+                          ImportCheckpoint, Post)
+
+User = get_user_model()
+
+
+class CheckQueryPlansTests(TestCase):
+    def test_feed_queries_use_indexes(self):
+        out = StringIO()
+        call_command("check_query_plans", stdout=out)
+        self.assertIn("проблем нет", out.getvalue())
+
+
+class ReconcilePostCountersTests(TestCase):
+    def test_drift_is_repaired(self):
+        user = User.objects.create_user(username="Test")
+        group = Group.objects.create(title="Группа", slug="group")
+        Post.objects.bulk_create(
+            Post(author=user, group=group, text=str(i)) for i in range(3))
+        AuthorPostCounter.objects.update_or_create(
+            pk=user.pk, defaults={"posts_count": 42})
+        call_command("reconcile_post_counters", chunk_size=1,
+                     stdout=StringIO())
+        self.assertEqual(
+            AuthorPostCounter.objects.get(pk=user.pk).posts_count, 3)
+        self.assertEqual(
+            GroupPostCounter.objects.get(pk=group.pk).posts_count, 3)
+
+
+class BackfillPostHtmlTests(TestCase):
+    def test_empty_rows_are_filled_in_chunks(self):
+        user = User.objects.create_user(username="Test")
+        Post.objects.bulk_create(
+            Post(author=user, text=f"<i>{i}</i>") for i in range(3))
+        # Так выглядят строки, созданные до появления колонок.
+        Post.objects.update(text_html="", excerpt="")
+        out = StringIO()
+        call_command("backfill_post_html", chunk_size=2, stdout=out)
+        self.assertIn("постов: 3", out.getvalue())
+        self.assertEqual(
+            set(Post.objects.values_list("text_html", flat=True)),
+            {f"&lt;i&gt;{i}&lt;/i&gt;" for i in range(3)})
+        call_command("backfill_post_html", stdout=out)
+        self.assertIn("постов: 0", out.getvalue())
+
+    def test_chunk_is_read_in_the_writing_transaction(self):
+        user = User.objects.create_user(username="Test")
+        Post.objects.bulk_create(
+            Post(author=user, text=f"<i>{i}</i>") for i in range(3))
+        Post.objects.update(text_html="")
+        depth = len(connection.savepoint_ids)
+        chunk_depths = []
+        render_text = Post.render_text
+
+        def remember_depth(post):
+            chunk_depths.append(len(connection.savepoint_ids))
+            render_text(post)
+
+        with mock.patch.object(Post, "render_text", remember_depth):
+            call_command("backfill_post_html", stdout=StringIO())
+        self.assertEqual(chunk_depths, [depth + 1] * 3)
+
+
+class ImportPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Test")
+        cls.group = Group.objects.create(title="Группа", slug="group")
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def test_import_jsonl(self):
+        records = [
+            {"text": f"пост {i}", "author": "Test", "group": "group",
+             "pub_date": "2020-01-0%dT10:00:00+00:00" % (i + 1)}
+            for i in range(5)
+        ]
+        records.append({"text": "без автора", "author": "nobody"})
+        path = self.write("posts.jsonl",
+                          "\n".join(json.dumps(r) for r in records))
+        call_command("import_posts", path, batch_size=2, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 5)
+        self.assertEqual(Post.objects.latest("pub_date").pub_date.day, 5)
+        self.assertEqual(
+            AuthorPostCounter.objects.get(pk=self.user.pk).posts_count, 5)
+        self.assertEqual(
+            GroupPostCounter.objects.get(pk=self.group.pk).posts_count, 5)
+
+    def test_import_csv_creates_missing_authors(self):
+        path = self.write("posts.csv",
+                          "text,author,group\nпривет,new-author,\n")
+        call_command("import_posts", path, create_missing=True,
+                     stdout=StringIO())
+        post = Post.objects.get()
+        self.assertEqual(post.author.username, "new-author")
+        self.assertIsNone(post.group)
+
+    def test_resume_from_checkpoint(self):
+        path = self.write("posts.jsonl", "\n".join(
+            json.dumps({"text": f"пост {i}", "author": "Test"})
+            for i in range(4)))
+        ImportCheckpoint.objects.create(name="posts", position=3)
+        call_command("import_posts", path, checkpoint="posts",
+                     stdout=StringIO())
+        self.assertEqual(list(Post.objects.values_list("text", flat=True)),
+                         ["пост 3"])
+        self.assertEqual(
+            ImportCheckpoint.objects.get(name="posts").position, 4)
+
+    def import_lines(self, *lines):
+        path = self.write("posts.jsonl", "\n".join(lines))
+        stdout, stderr = StringIO(), StringIO()
+        call_command("import_posts", path, checkpoint="broken",
+                     batch_size=1, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_broken_json_is_reported_and_skipped(self):
+        stdout, stderr = self.import_lines(
+            json.dumps({"text": "пост", "author": "Test"}), "", "{oops",
+            json.dumps({"text": "после", "author": "Test"}))
+        self.assertIn("Строка 3: некорректный JSON", stderr)
+        self.assertIn("с ошибками: 1", stdout)
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(
+            ImportCheckpoint.objects.get(name="broken").position, 2)
+
+    def test_impossible_date_is_reported_and_skipped(self):
+        stdout, stderr = self.import_lines(
+            json.dumps({"text": "пост", "author": "Test",
+                        "pub_date": "2021-13-45T10:00"}),
+            json.dumps({"text": "после", "author": "Test"}))
+        self.assertIn("Строка 1: некорректная запись", stderr)
+        self.assertIn("с ошибками: 1", stdout)
+        self.assertEqual(list(Post.objects.values_list("text", flat=True)),
+                         ["после"])
+
+    def test_non_string_author_or_group_is_reported_and_skipped(self):
+        stdout, stderr = self.import_lines(
+            json.dumps({"text": "пост", "author": ["Test"]}),
+            json.dumps({"text": "пост", "author": "Test",
+                        "group": {"slug": "group"}}),
+            json.dumps({"text": "после", "author": "Test"}))
+        self.assertIn("Строка 1: некорректная запись", stderr)
+        self.assertIn("Строка 2: некорректная запись", stderr)
+        self.assertIn("с ошибками: 2", stdout)
+        self.assertEqual(list(Post.objects.values_list("text", flat=True)),
+                         ["после"])
+
+
+class SeedScaleTests(TestCase):
+    def test_seed_creates_posts_and_counters(self):
+        call_command("seed_scale", authors=3, groups=2, posts=40,
+                     batch_size=15, stdout=StringIO())
+        self.assertEqual(User.objects.filter(
+            username__startswith="seed_user_").count(), 3)
+        self.assertEqual(Post.objects.count(), 40)
+        counted = sum(AuthorPostCounter.objects.values_list(
+            "posts_count", flat=True))
+        self.assertEqual(counted, 40)
+        user = User.objects.get(username="seed_user_0")
+        self.assertTrue(user.check_password("seed-password"))
+
+
+class LoadTestTests(TransactionTestCase):
+    def test_report_covers_every_route(self):
+        call_command("seed_scale", authors=2, groups=2, posts=20,
+                     stdout=StringIO())
+        out = StringIO()
+        call_command("load_test", requests=4, workers=2,
+                     username="seed_user_0", stdout=out, stderr=StringIO())
+        report = json.loads(out.getvalue())
+        self.assertEqual(len(report), 15)
+        for name in report:
+            self.assertEqual(report[name]["requests"], 4)
+            self.assertEqual(report[name]["errors"], 0)
+            self.assertLessEqual(report[name]["p50_ms"],
+                                 report[name]["p99_ms"])
+        self.assertNotIn("users:logout", report)
+        self.assertGreater(report["posts:index"]["queries_avg"], 0)
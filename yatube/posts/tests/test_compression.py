@@ -0,0 +1,93 @@
+import gzip
+import json
+import zlib
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from core import compression
+from posts.models import Post
+
+User = get_user_model()
+
+USERNAME = "Test"
+
+
+class CompressionMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f"Тестовый пост {i}")
+            for i in range(15))
+
+    def setUp(self):
+        compression.stats.clear()
+
+    def test_html_feed_is_gzipped(self):
+        response = self.client.get(reverse("posts:index"),
+                                   HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertTrue(response["ETag"].startswith('W/"'))
+        html = gzip.decompress(response.content).decode()
+        self.assertIn("Тестовый пост 14", html)
+        self.assertEqual(int(response["Content-Length"]),
+                         len(response.content))
+        self.assertLess(compression.compression_ratio("gzip"), 1)
+
+    def test_weak_etag_still_revalidates(self):
+        url = reverse("posts:index")
+        etag = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")["ETag"]
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip",
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_streaming_export_is_compressed_incrementally(self):
+        response = self.client.get(
+            reverse("posts:profile_export", args=[USERNAME]),
+            HTTP_ACCEPT_ENCODING="gzip")
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertFalse(response.has_header("Content-Length"))
+        body = gzip.decompress(b"".join(response.streaming_content))
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual(len(rows), 15)
+        self.assertGreater(compression.stats["gzip:in"], 0)
+
+    def test_each_stream_chunk_is_flushed(self):
+        chunks = compression.compress_stream(
+            iter([b"first row\n", b"second row\n"]), "gzip")
+        decompressor = zlib.decompressobj(compression.GZIP_WBITS)
+        self.assertEqual(decompressor.decompress(next(chunks)),
+                         b"first row\n")
+
+    def test_skipped_responses(self):
+        cases = {
+            "без Accept-Encoding": (reverse("posts:index"), ""),
+            "маленький ответ": (
+                reverse("posts:posts_since", args=[10 ** 6]), "gzip"),
+        }
+        for case, (url, accept) in cases.items():
+            with self.subTest(case=case):
+                response = self.client.get(url, HTTP_ACCEPT_ENCODING=accept)
+                self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_level_depends_on_size(self):
+        small = compression.levels_for(1024)
+        large = compression.levels_for(10 * 1024 * 1024)
+        self.assertGreater(small[0], large[0])
+
+    def test_refused_encodings(self):
+        factory = RequestFactory()
+        for header in ("gzip;q=0", "gzip; q=0.000", "GZIP;Q=0",
+                       "gzip;q=oops"):
+            with self.subTest(header=header):
+                request = factory.get("/", HTTP_ACCEPT_ENCODING=header)
+                self.assertEqual(compression.accepted_encodings(request),
+                                 set())
+                self.assertIsNone(compression.choose_encoding(request))
+        request = factory.get("/", HTTP_ACCEPT_ENCODING="br;q=0, gzip;q=0.5")
+        self.assertEqual(compression.choose_encoding(request), "gzip")
@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+USERNAME = "Test"
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(title="Группа", slug="group")
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(author=self.user, group=self.group,
+                                        text="Тестовый текст")
+
+    def urls(self):
+        return (
+            reverse("posts:index"),
+            reverse("posts:slug", args=[self.group.slug]),
+            reverse("posts:profile", args=[USERNAME]),
+            reverse("posts:post_detail", args=[self.post.pk]),
+        )
+
+    def test_matching_etag_returns_304_with_one_query(self):
+        for url in self.urls():
+            with self.subTest(url=url):
+                etag = self.client.get(url)["ETag"]
+                with self.assertNumQueries(1):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b"")
+
+    def test_if_modified_since_returns_304(self):
+        url = reverse("posts:index")
+        last_modified = self.client.get(url)["Last-Modified"]
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_edit_changes_etag(self):
+        etags = [self.client.get(url)["ETag"] for url in self.urls()]
+        self.post.text = "Новый текст"
+        self.post.save()
+        for url, etag in zip(self.urls(), etags):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_delete_changes_etag(self):
+        url = reverse("posts:index")
+        etag = self.client.get(url)["ETag"]
+        Post.objects.create(author=self.user, text="Ещё пост").delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_differs_per_user(self):
+        url = reverse("posts:index")
+        etag = self.client.get(url)["ETag"]
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("Last-Modified"))
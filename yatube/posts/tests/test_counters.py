@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from posts.models import AuthorPostCounter, Group, GroupPostCounter, Post
+
+User = get_user_model()
+
+
+class PostCounterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Test")
+        cls.group = Group.objects.create(title="Группа", slug="group")
+        cls.other_group = Group.objects.create(title="Другая",
+                                               slug="other-group")
+
+    def author_count(self):
+        return AuthorPostCounter.objects.get(pk=self.user.pk).posts_count
+
+    def group_count(self, group):
+        return GroupPostCounter.objects.get(pk=group.pk).posts_count
+
+    def test_create_increments_counters(self):
+        Post.objects.create(author=self.user, group=self.group, text="1")
+        Post.objects.create(author=self.user, text="2")
+        self.assertEqual(self.author_count(), 2)
+        self.assertEqual(self.group_count(self.group), 1)
+
+    def test_group_change_moves_counter(self):
+        post = Post.objects.create(author=self.user, group=self.group,
+                                   text="текст")
+        post.group = self.other_group
+        post.save()
+        self.assertEqual(self.group_count(self.group), 0)
+        self.assertEqual(self.group_count(self.other_group), 1)
+        self.assertEqual(self.author_count(), 1)
+
+    def test_bulk_delete_decrements_counters(self):
+        for i in range(3):
+            Post.objects.create(author=self.user, group=self.group,
+                                text=str(i))
+        Post.objects.filter(author=self.user).delete()
+        self.assertEqual(self.author_count(), 0)
+        self.assertEqual(self.group_count(self.group), 0)
+
+    def test_profile_shows_counter(self):
+        Post.objects.create(author=self.user, text="текст")
+        response = self.client.get(f"/profile/{self.user.username}/")
+        self.assertContains(response, "Всего постов: 1")
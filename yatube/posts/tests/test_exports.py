@@ -0,0 +1,57 @@
+import csv
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+USERNAME = "Test"
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(title="Группа", slug="group")
+        Post.objects.bulk_create(
+            Post(author=cls.user, group=cls.group, text=f"пост, {i}")
+            for i in range(5))
+        Post.objects.create(author=cls.user, text="без группы")
+
+    def test_profile_export_streams_jsonl(self):
+        response = self.client.get(
+            reverse("posts:profile_export", args=[USERNAME]))
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in
+                b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]["author"], USERNAME)
+        self.assertEqual(rows[-1]["group"], None)
+
+    def test_group_export_streams_csv(self):
+        response = self.client.get(
+            reverse("posts:group_export", args=[self.group.slug]))
+        self.assertIn('filename="group.csv"',
+                      response["Content-Disposition"])
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["text"], "пост, 0")
+
+    def test_unknown_author_is_404(self):
+        response = self.client.get(
+            reverse("posts:profile_export", args=["nobody"]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_export_command(self):
+        out = StringIO()
+        call_command("export_posts", "--group", self.group.slug,
+                     "--format", "csv", stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 6)
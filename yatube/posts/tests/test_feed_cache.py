@@ -0,0 +1,123 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.cache import SQLiteCache
+from core.tasks import process_batch
+from posts.feed_cache import generation_key, refreshing_key, stats
+from posts.models import Group, Post
+
+User = get_user_model()
+
+USERNAME = "Test"
+
+
+class FeedCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(title="Группа", slug="group")
+
+    def setUp(self):
+        cache.clear()
+        stats.clear()
+        self.post = Post.objects.create(author=self.user, group=self.group,
+                                        text="Старый текст")
+
+    def feed_urls(self):
+        return (
+            ("index", reverse("posts:index")),
+            ("group", reverse("posts:slug", args=[self.group.slug])),
+            ("author", reverse("posts:profile", args=[USERNAME])),
+        )
+
+    def test_second_request_hits_cache(self):
+        for feed, url in self.feed_urls():
+            with self.subTest(feed=feed):
+                self.client.get(url)
+                self.client.get(url)
+                self.assertEqual(stats[f"{feed}:miss"], 1)
+                self.assertEqual(stats[f"{feed}:hit"], 1)
+
+    def test_edit_invalidates_every_feed(self):
+        for _, url in self.feed_urls():
+            self.client.get(url)
+        self.post.text = "Новый текст"
+        self.post.save()
+        for feed, url in self.feed_urls():
+            with self.subTest(feed=feed):
+                self.assertContains(self.client.get(url), "Новый текст")
+                self.assertEqual(stats[f"{feed}:miss"], 2)
+
+    def test_edit_bumps_generations_for_other_workers(self):
+        other_worker = SQLiteCache("default", {})
+        keys = [generation_key(feed) for feed in
+                ("index", f"author:{self.user.pk}",
+                 f"group:{self.group.pk}", f"post:{self.post.pk}")]
+        before = other_worker.get_many(keys)
+        self.post.text = "Новый текст"
+        self.post.save()
+        after = other_worker.get_many(keys)
+        for key in keys:
+            with self.subTest(key=key):
+                self.assertGreater(after[key], before[key])
+
+    def test_other_group_feed_is_not_invalidated(self):
+        other = Group.objects.create(title="Другая", slug="other")
+        Post.objects.create(author=self.user, group=other, text="Чужой")
+        url = reverse("posts:slug", args=[other.slug])
+        self.client.get(url)
+        self.post.text = "Новый текст"
+        self.post.save()
+        self.client.get(url)
+        self.assertEqual(stats["group:hit"], 1)
+
+
+@override_settings(TASKS_MODE="db")
+class WriteThroughTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(title="Группа", slug="group")
+
+    def setUp(self):
+        cache.clear()
+        stats.clear()
+        self.post = Post.objects.create(author=self.user, group=self.group,
+                                        text="Старый текст")
+        self.author = Client()
+        self.author.force_login(self.user)
+
+    def test_readers_get_old_feed_until_refresh(self):
+        url = reverse("posts:slug", args=[self.group.slug])
+        self.client.get(url)
+        self.author.post(reverse("posts:post_create"),
+                         {"text": "Новый пост", "group": self.group.pk})
+        response = self.client.get(url)
+        self.assertNotContains(response, "Новый пост")
+        self.assertEqual(stats["group:stale"], 1)
+        self.assertContains(self.author.get(url), "Новый пост")
+        process_batch()
+        self.assertIsNone(cache.get(refreshing_key(f"group:{self.group.pk}")))
+        stats.clear()
+        self.assertContains(self.client.get(url), "Новый пост")
+        self.assertEqual(stats["group:hit"], 1)
+
+    def test_post_detail_is_rewarmed_after_edit(self):
+        url = reverse("posts:post_detail", args=[self.post.pk])
+        self.client.get(url)
+        self.author.post(reverse("posts:post_edit", args=[self.post.pk]),
+                         {"text": "Исправленный текст"})
+        self.assertContains(self.client.get(url), "Старый текст")
+        process_batch()
+        stats.clear()
+        self.assertContains(self.client.get(url), "Исправленный текст")
+        self.assertEqual(stats["post:hit"], 1)
+
+    def test_without_previous_version_readers_render(self):
+        self.author.post(reverse("posts:post_create"), {"text": "Пост"})
+        self.assertContains(self.client.get(reverse("posts:index")), "Пост")
+        self.assertEqual(stats["index:miss"], 1)
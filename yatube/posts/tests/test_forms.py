@@ -1,7 +1,10 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from posts.feed_cache import get_generation
 from posts.forms import PostForm
 from ..models import Group, Post
 
@@ -100,3 +103,66 @@ class PostFormTests(TestCase):
         post = Post.objects.get(id=self.post.id)
         self.assertNotEqual(post.text, form_data["text"])
         self.assertNotEqual(post.group.id, form_data["group"])
+
+
+class PostEditConcurrencyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(title="Группа", slug="test-slug")
+
+    def setUp(self):
+        self.post = Post.objects.create(author=self.user, group=self.group,
+                                        text="Исходный текст")
+        self.url = reverse("posts:post_edit", args=[self.post.pk])
+        self.client.force_login(self.user)
+
+    def edit(self, text, version):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {
+                "text": text, "group": self.group.pk, "version": version})
+        updates = [query["sql"] for query in queries
+                   if query["sql"].startswith("UPDATE \"posts_post\"")]
+        return response, updates
+
+    def test_edit_updates_only_changed_columns(self):
+        response, updates = self.edit("Новый текст", 1)
+        self.assertRedirects(response, self.post.get_absolute_url())
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"version" = 1', updates[0])
+        self.assertNotIn("group_id", updates[0])
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.text, self.post.version),
+                         ("Новый текст", 2))
+
+    def test_stale_version_rerenders_form(self):
+        self.edit("Первая правка", 1)
+        response, _ = self.edit("Вторая правка", 1)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["form"].non_field_errors())
+        self.assertEqual(response.context["post"].version, 2)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text, "Первая правка")
+
+    def test_invalid_form_keeps_submitted_version(self):
+        self.edit("Первая правка", 1)
+        response, _ = self.edit("", 1)
+        self.assertEqual(response.context["version"], 1)
+        self.assertContains(response, 'name="version" value="1"')
+        response, _ = self.edit("Вторая правка", 1)
+        self.assertTrue(response.context["form"].non_field_errors())
+
+    def test_plain_save_of_stale_instance_bumps_version_in_sql(self):
+        stale = Post.objects.get(pk=self.post.pk)
+        self.post.text = "Правка из админки"
+        self.post.save()
+        stale.save()
+        self.assertEqual(stale.version, 3)
+        self.assertEqual(Post.objects.get(pk=self.post.pk).version, 3)
+
+    def test_unchanged_form_skips_write_and_invalidation(self):
+        generation = get_generation(f"post:{self.post.pk}")
+        response, updates = self.edit("Исходный текст", 1)
+        self.assertRedirects(response, self.post.get_absolute_url())
+        self.assertEqual(updates, [])
+        self.assertEqual(get_generation(f"post:{self.post.pk}"), generation)
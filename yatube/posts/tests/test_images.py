@@ -0,0 +1,74 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from core.models import Task
+from core.tasks import process_batch
+from posts.models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_image(name="cat.png", size=(1200, 800)):
+    buffer = BytesIO()
+    Image.new("RGB", size, "orange").save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(),
+                              content_type="image/png")
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, TASKS_MODE="db")
+class PostImageTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="Test")
+        self.client.force_login(self.user)
+
+    def create_post(self):
+        self.client.post(reverse("posts:post_create"),
+                         {"text": "Пост с котом", "image": make_image()})
+        return Post.objects.get()
+
+    def test_renditions_are_generated_in_background(self):
+        post = self.create_post()
+        self.assertTrue(post.image.name.startswith("posts/"))
+        self.assertEqual(Task.objects.get().name,
+                         "posts.tasks.render_post_images")
+        html = self.client.get(reverse("posts:index")).content.decode()
+        self.assertIn(post.image.url, html)
+        self.assertNotIn("srcset", html)
+        process_batch()
+        response = self.client.get(reverse("posts:index"))
+        self.assertContains(response, 'loading="lazy"')
+        self.assertContains(response, "480w")
+        self.assertContains(response, "960w")
+        self.assertContains(response, 'width="480" height="270"')
+
+    def test_detail_uses_large_eager_rendition(self):
+        post = self.create_post()
+        process_batch()
+        response = self.client.get(
+            reverse("posts:post_detail", args=[post.pk]))
+        self.assertContains(response, "960w")
+        # Без апскейла: оригинал шириной 1200 не растягивается до 1920.
+        self.assertContains(response, "1200w")
+        self.assertNotContains(response, 'loading="lazy"')
+
+    def test_non_image_upload_is_rejected(self):
+        upload = SimpleUploadedFile("cat.png", b"not an image",
+                                    content_type="image/png")
+        response = self.client.post(reverse("posts:post_create"),
+                                    {"text": "Пост", "image": upload})
+        self.assertFalse(Post.objects.exists())
+        self.assertTrue(response.context["form"].errors["image"])
@@ -0,0 +1,76 @@
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from posts import live
+from posts.models import Group, Post
+
+User = get_user_model()
+
+USERNAME = "Test"
+
+
+class PostsSinceTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(title="Группа", slug="group")
+        cls.old = Post.objects.create(author=cls.user, text="старый")
+        cls.new = Post.objects.create(author=cls.user, group=cls.group,
+                                      text="новый")
+        cls.other = Post.objects.create(author=cls.user, text="другой")
+
+    def since(self, post_id, **params):
+        return self.client.get(
+            reverse("posts:posts_since", args=[post_id]), params).json()
+
+    def test_returns_only_newer_posts(self):
+        data = self.since(self.old.pk)
+        self.assertEqual([post["id"] for post in data["posts"]],
+                         [self.new.pk, self.other.pk])
+        self.assertEqual(data["last_id"], self.other.pk)
+
+    def test_filter_by_group(self):
+        data = self.since(self.old.pk, group=self.group.slug)
+        self.assertEqual([post["id"] for post in data["posts"]],
+                         [self.new.pk])
+
+    def test_nothing_new_keeps_last_id(self):
+        data = self.since(self.other.pk)
+        self.assertEqual(data, {"posts": [], "last_id": self.other.pk})
+
+    def test_non_finite_wait_does_not_block(self):
+        for wait in ("nan", "inf", "-inf"):
+            with self.subTest(wait=wait), mock.patch(
+                    "posts.views.wait_for_post_after") as wait_for:
+                data = self.since(self.other.pk, wait=wait)
+                self.assertEqual(data["posts"], [])
+                wait_for.assert_not_called()
+
+
+class LiveWakeupTests(SimpleTestCase):
+    def test_new_post_wakes_waiter(self):
+        after = live.latest_id() + 1000
+        result = {}
+
+        def waiter():
+            started = time.monotonic()
+            result["woken"] = live.wait_for_post_after(after, timeout=5)
+            result["elapsed"] = time.monotonic() - started
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        time.sleep(0.05)
+        live.notify_new_post(after + 1)
+        thread.join()
+        self.assertTrue(result["woken"])
+        self.assertLess(result["elapsed"], 5)
+
+    def test_waiter_times_out(self):
+        self.assertFalse(live.wait_for_post_after(live.latest_id() + 1000,
+                                                  timeout=0.01))
@@ -1,6 +1,9 @@
 from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
 
-from ..models import Group, Post
+from ..models import EXCERPT_LENGTH, Group, Post
+from ..routes import _reverse
 
 User = get_user_model()
 
@@ -48,3 +51,56 @@ class PostModelTest():
                 self.assertEqual(
                     post._meta.get_field(value).help_text, expected
                 )
+
+
+class PostRoutesTest(SimpleTestCase):
+    def setUp(self):
+        _reverse.cache_clear()
+        self.group = Group(slug="group")
+        self.post = Post(pk=5, author=User(username="auth"),
+                         group=self.group)
+
+    def test_model_urls_match_reverse(self):
+        urls = {
+            self.post.get_absolute_url(): reverse("posts:post_detail",
+                                                  args=[5]),
+            self.post.get_edit_url(): reverse("posts:post_edit", args=[5]),
+            self.post.get_author_url(): reverse("posts:profile",
+                                                args=["auth"]),
+            self.group.get_absolute_url(): reverse("posts:slug",
+                                                   args=["group"]),
+        }
+        for url, expected in urls.items():
+            with self.subTest(url=url):
+                self.assertEqual(url, expected)
+
+    def test_repeated_urls_are_memoized(self):
+        for _ in range(3):
+            self.post.get_absolute_url()
+        info = _reverse.cache_info()
+        self.assertEqual((info.hits, info.misses), (2, 1))
+
+
+class PostRenderedTextTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="auth")
+
+    def test_save_renders_escaped_html_and_excerpt(self):
+        post = Post.objects.create(author=self.user,
+                                   text="<script>\nстрока" + "я" * 400)
+        post.refresh_from_db()
+        self.assertTrue(post.text_html.startswith("&lt;script&gt;<br>"))
+        self.assertEqual(len(post.excerpt), EXCERPT_LENGTH)
+        self.assertEqual(post.rendered_text, post.text_html)
+
+    def test_update_fields_with_text_refreshes_columns(self):
+        post = Post.objects.create(author=self.user, text="старый")
+        post.text = "новый"
+        post.save(update_fields=["text"])
+        post.refresh_from_db()
+        self.assertEqual((post.text_html, post.excerpt), ("новый", "новый"))
+
+    def test_rendered_text_falls_back_for_old_rows(self):
+        post = Post(author=self.user, text="a\n<b>")
+        self.assertEqual(post.rendered_text, "a<br>&lt;b&gt;")
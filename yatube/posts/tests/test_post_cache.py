@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.cache import SQLiteCache
+from posts import post_cache
+from posts.feed_cache import generation_key
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostSnapshotCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="Test")
+        cls.group = Group.objects.create(title="Группа", slug="group")
+
+    def setUp(self):
+        cache.clear()
+        post_cache.stats.clear()
+        post_cache.get_snapshots().clear()
+        self.post = Post.objects.create(author=self.user, group=self.group,
+                                        text="Старый текст")
+        self.url = reverse("posts:post_detail", args=[self.post.pk])
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        return response, len(queries)
+
+    def test_repeated_detail_skips_post_query(self):
+        _, first = self.count_queries()
+        response, second = self.count_queries()
+        self.assertEqual(second, first - 1)
+        self.assertEqual(response.context["post"].author.username, "Test")
+        self.assertEqual(post_cache.metrics()["hit_rate"], 0.5)
+
+    def test_edit_invalidates_snapshot(self):
+        self.client.get(self.url)
+        self.post.text = "Новый текст"
+        self.post.save()
+        response = self.client.get(self.url)
+        self.assertContains(response, "Новый текст")
+        self.assertEqual(post_cache.stats["stale"], 1)
+
+    def test_bump_from_other_worker_invalidates_snapshot(self):
+        self.client.get(self.url)
+        # Правку обработал другой процесс: он сдвинул поколение поста
+        # в общем кэше через своё подключение.
+        other_worker = SQLiteCache("default", {})
+        key = generation_key(f"post:{self.post.pk}")
+        other_worker.set(key, other_worker.get(key) + 1)
+        self.client.get(self.url)
+        self.assertEqual(post_cache.stats["stale"], 1)
+        self.assertEqual(post_cache.stats["hits"], 0)
+
+    def test_new_post_of_author_refreshes_count(self):
+        self.client.get(self.url)
+        Post.objects.create(author=self.user, text="Ещё пост")
+        response = self.client.get(self.url)
+        self.assertContains(response, "Всего постов автора: 2")
+
+    def test_deleted_post_is_not_served(self):
+        self.client.get(self.url)
+        self.post.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(len(post_cache.get_snapshots()), 0)
+
+    @override_settings(POST_CACHE_TTL=0)
+    def test_expired_snapshot_is_reloaded(self):
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.assertEqual(post_cache.stats["expired"], 1)
+        self.assertEqual(post_cache.stats["hits"], 0)
+
+    def test_least_recently_used_is_evicted(self):
+        snapshots = post_cache.SnapshotCache(max_size=2, ttl=60)
+        for post_id in (1, 2):
+            snapshots.put(post_id, object(), ())
+        snapshots.get(1)
+        snapshots.put(3, object(), ())
+        self.assertIsNone(snapshots.get(2))
+        self.assertIsNotNone(snapshots.get(1))
+        self.assertEqual(post_cache.stats["evictions"], 1)
+
+    def test_metrics_endpoint_is_staff_only(self):
+        self.count_queries()
+        self.count_queries()
+        url = reverse("posts:post_cache_metrics")
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 302)
+        staff = User.objects.create_user(username="staff", is_staff=True)
+        self.client.force_login(staff)
+        data = self.client.get(url).json()
+        self.assertEqual(data["hits"], 1)
+        self.assertEqual(data["hit_rate"], 0.5)
+        self.assertIn("evictions", data)
@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.profiling import TEMPLATE_RENDER, make_token, template_time
+from posts.models import Post
+
+User = get_user_model()
+
+
+class ProfilingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="Test")
+        Post.objects.create(author=cls.user, text="Тестовый пост")
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.profiles = tmp_dir.name
+        settings = override_settings(PROFILING_DIR=self.profiles,
+                                     PROFILING_KEEP=2,
+                                     PROFILING_SAMPLE_RATE=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_signed_header_writes_profile(self):
+        response = self.client.get(reverse("posts:index"),
+                                   HTTP_X_PROFILE=make_token())
+        profile_id = response["X-Profile-Id"]
+        path = os.path.join(self.profiles, profile_id)
+        self.assertTrue(os.path.exists(path + ".prof"))
+        with open(path + ".json", encoding="utf-8") as file:
+            summary = json.load(file)
+        self.assertEqual(summary["url_name"], "posts:index")
+        self.assertGreater(summary["sql_count"], 0)
+        self.assertGreater(summary["template_ms"], 0)
+        self.assertTrue(summary["top_functions"])
+
+    def test_requests_without_token_are_not_profiled(self):
+        for token in (None, "profile:forged:signature"):
+            extra = {"HTTP_X_PROFILE": token} if token else {}
+            response = self.client.get(reverse("posts:index"), **extra)
+            self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(os.listdir(self.profiles), [])
+
+    @override_settings(PROFILING_SAMPLE_RATE=1)
+    def test_sampling_and_rotation(self):
+        for _ in range(4):
+            self.client.get(reverse("about:tech"))
+        self.assertEqual(len(os.listdir(self.profiles)), 4)
+
+
+class TemplateTimeTests(TestCase):
+    def test_template_render_is_picked_by_line(self):
+        node_render = (TEMPLATE_RENDER[0], TEMPLATE_RENDER[1] + 700,
+                       "render")
+        stats = SimpleNamespace(stats={
+            node_render: (1, 1, 0.1, 0.2, {}),
+            TEMPLATE_RENDER: (1, 1, 0.01, 0.5, {}),
+        })
+        self.assertEqual(template_time(stats), 0.5)
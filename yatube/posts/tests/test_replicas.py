@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core import replicas
+from posts import views
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = replicas.ReplicaRouter()
+        self.routed = {}
+        self.written = None
+
+        def get_response(request):
+            self.routed["post"] = self.router.db_for_read(Post)
+            self.routed["session"] = self.router.db_for_read(Session)
+            if self.written is not None:
+                replicas.remember_write(self.written[0],
+                                        update_fields=self.written[1])
+            return HttpResponse()
+
+        self.middleware = replicas.ReplicaMiddleware(get_response)
+
+    def run_view(self, request, view):
+        request.session = getattr(request, "session", SessionStore())
+        self.middleware.process_view(request, view, (), {})
+        return self.middleware(request)
+
+    def test_read_only_view_reads_from_replica(self):
+        self.run_view(self.factory.get("/"), views.index)
+        self.assertEqual(self.routed, {"post": "replica", "session": None})
+        self.assertIsNone(self.router.db_for_read(Post))
+
+    def test_other_views_read_from_primary(self):
+        self.run_view(self.factory.get("/create/"), views.post_create)
+        self.assertIsNone(self.routed["post"])
+
+    def test_writes_go_to_primary(self):
+        self.assertEqual(self.router.db_for_write(Post), "default")
+
+    def pinned_after(self, written):
+        self.written = written
+        request = self.factory.post("/create/")
+        self.run_view(request, views.post_create)
+        self.written = None
+        return replicas.is_pinned(request)
+
+    def test_write_pins_session_to_primary(self):
+        request = self.factory.post("/create/")
+        self.written = (Post, None)
+        self.run_view(request, views.post_create)
+        self.written = None
+        follow_up = self.factory.get("/")
+        follow_up.session = request.session
+        self.run_view(follow_up, views.index)
+        self.assertIsNone(self.routed["post"])
+
+    def test_post_without_writes_does_not_pin(self):
+        self.assertFalse(self.pinned_after(None))
+        self.assertFalse(self.pinned_after((Session, None)))
+        self.assertFalse(self.pinned_after((User, {"last_login"})))
+        self.assertTrue(self.pinned_after((User, None)))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_reads_primary(self):
+        self.run_view(self.factory.get("/"), views.index)
+        self.assertIsNone(self.routed["post"])
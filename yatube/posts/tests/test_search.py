@@ -0,0 +1,109 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.management.commands import rebuild_search_index
+from posts.models import Post
+
+User = get_user_model()
+
+USERNAME = "Test"
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.best = Post.objects.create(author=cls.user,
+                                       text="котики котики и <b>котики</b>")
+        cls.other = Post.objects.create(author=cls.user,
+                                        text="собаки и один котик")
+        cls.unrelated = Post.objects.create(author=cls.user,
+                                            text="про погоду")
+
+    def search(self, query, **params):
+        response = self.client.get(reverse("posts:search"),
+                                   {"q": query, **params})
+        return response.context["page_obj"]
+
+    def test_results_are_ranked(self):
+        self.assertEqual(list(self.search("котик")),
+                         [self.best, self.other])
+
+    def test_snippet_is_highlighted_and_escaped(self):
+        snippet = self.search("котики")[0].search_snippet
+        self.assertIn("<mark>котики</mark>", snippet)
+        self.assertIn("&lt;b&gt;", snippet)
+
+    def test_fts_syntax_in_query_is_harmless(self):
+        response = self.client.get(reverse("posts:search"),
+                                   {"q": 'котики" OR NEAR(*'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_cursor_pagination(self):
+        with self.settings(QUANTITY_POSTS=1):
+            first = self.search("кот")
+            second = self.search("кот", after=first.next_cursor)
+            back = self.search("кот", before=second.previous_cursor)
+        self.assertEqual(list(first) + list(second),
+                         [self.best, self.other])
+        self.assertFalse(second.has_next())
+        self.assertEqual(list(back), list(first))
+
+    def test_index_follows_edits_and_deletes(self):
+        post = Post.objects.get(pk=self.unrelated.pk)
+        post.text = "погода для котиков"
+        post.save()
+        self.assertIn(post, list(self.search("котиков")))
+        Post.objects.filter(pk=self.other.pk).delete()
+        self.assertNotIn(self.other, list(self.search("котик")))
+
+    def test_admin_search_uses_index(self):
+        admin = User.objects.create_superuser("admin", "a@a.ru", "pass")
+        client = Client()
+        client.force_login(admin)
+        response = client.get(reverse("admin:posts_post_changelist"),
+                              {"q": "собаки"})
+        self.assertEqual(list(response.context["cl"].result_list),
+                         [self.other])
+
+    def test_rebuild_command_restores_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO posts_post_fts(posts_post_fts) "
+                           "VALUES ('delete-all')")
+        self.assertEqual(len(self.search("котик")), 0)
+        call_command("rebuild_search_index", batch_size=2,
+                     stdout=StringIO())
+        self.assertEqual(len(self.search("котик")), 2)
+
+    def test_rebuild_keeps_changes_made_meanwhile(self):
+        index_batch = rebuild_search_index.Command.index_batch
+        changed = []
+
+        def batch_then_write(command, cursor, batch_size):
+            indexed = index_batch(command, cursor, batch_size)
+            if not changed:
+                # Пишут, пока идёт перестройка: первая порция уже в
+                # новом индексе, остальные ещё нет.
+                changed.append(Post.objects.create(author=self.user,
+                                                   text="новый котик"))
+                Post.objects.filter(pk=self.best.pk).update(text="попугай")
+            return indexed
+
+        with mock.patch.object(rebuild_search_index.Command, "index_batch",
+                               batch_then_write):
+            call_command("rebuild_search_index", batch_size=1,
+                         stdout=StringIO())
+        self.assertEqual(list(self.search("котик")),
+                         [changed[0], self.other])
+        self.assertEqual(len(self.search("попугай")), 1)
+        post = Post.objects.get(pk=self.unrelated.pk)
+        post.text = "котик после перестройки"
+        post.save()
+        self.assertEqual(len(self.search("котик")), 3)
@@ -0,0 +1,33 @@
+from django.core.cache import cache, caches
+from django.test import SimpleTestCase
+
+from core.cache import SQLiteCache
+from posts.paginators import INDEX_COUNT_KEY
+
+
+class SharedCacheTests(SimpleTestCase):
+    """Кэш общий: запись через другое подключение видна сразу."""
+
+    def setUp(self):
+        cache.clear()
+        # Отдельный экземпляр со своим подключением, как у другого воркера.
+        self.other_worker = SQLiteCache("default", {})
+
+    def test_default_cache_is_shared_between_processes(self):
+        self.assertIsInstance(caches["default"], SQLiteCache)
+        self.assertEqual(self.other_worker.cache_path(),
+                         caches["default"].cache_path())
+
+    def test_index_count_reset_is_seen_by_other_workers(self):
+        self.other_worker.set(INDEX_COUNT_KEY, 42)
+        self.assertEqual(cache.get(INDEX_COUNT_KEY), 42)
+        cache.delete(INDEX_COUNT_KEY)
+        self.assertIsNone(self.other_worker.get(INDEX_COUNT_KEY))
+
+    def test_add_expiry_and_many(self):
+        self.assertTrue(cache.add("key", 1))
+        self.assertFalse(self.other_worker.add("key", 2))
+        cache.set("gone", 1, timeout=0)
+        self.assertTrue(self.other_worker.add("gone", 3))
+        self.assertEqual(cache.get_many(["key", "gone", "missing"]),
+                         {"key": 1, "gone": 3})
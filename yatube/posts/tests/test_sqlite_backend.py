@@ -0,0 +1,73 @@
+import os
+import sqlite3
+import tempfile
+from unittest import mock
+
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase
+
+from core.backends.sqlite3 import base
+from core.management.commands import benchmark_sqlite
+
+
+class SQLiteBackendTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_connection_uses_tuned_pragmas(self):
+        self.assertEqual(self.pragma("busy_timeout"),
+                         base.DEFAULT_PRAGMAS["busy_timeout"])
+        self.assertEqual(self.pragma("foreign_keys"), 1)
+        self.assertEqual(self.pragma("temp_store"), 2)
+
+
+class RetryingCursorTests(SimpleTestCase):
+    def setUp(self):
+        self.cursor = base.RetryingCursorWrapper(sqlite3.connect(":memory:"))
+        self.locked = sqlite3.OperationalError("database is locked")
+
+    @mock.patch.object(base.time, "sleep")
+    def test_lock_error_is_retried(self, sleep):
+        method = mock.Mock(side_effect=[self.locked, self.locked, "ok"])
+        self.assertEqual(self.cursor._retry(method, "SELECT 1", None), "ok")
+        self.assertEqual(method.call_count, 3)
+        self.assertEqual(sleep.call_count, 2)
+
+    @mock.patch.object(base.time, "sleep")
+    def test_gives_up_after_lock_retries(self, sleep):
+        method = mock.Mock(side_effect=self.locked)
+        with self.assertRaises(sqlite3.OperationalError):
+            self.cursor._retry(method, "SELECT 1", None)
+        self.assertEqual(method.call_count, base.LOCK_RETRIES + 1)
+
+    def test_other_errors_are_not_retried(self):
+        method = mock.Mock(side_effect=sqlite3.OperationalError("no table"))
+        with self.assertRaises(sqlite3.OperationalError):
+            self.cursor._retry(method, "SELECT 1", None)
+        self.assertEqual(method.call_count, 1)
+
+
+class BenchmarkTests(SimpleTestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, "benchmark.sqlite3")
+
+    def tearDown(self):
+        for mode in benchmark_sqlite.ENGINES:
+            alias = f"benchmark_{mode}"
+            if alias in connections.databases:
+                connections[alias].close()
+                del connections[alias]
+                del connections.databases[alias]
+
+    def test_tuned_mode_runs_through_shipped_backend(self):
+        alias = benchmark_sqlite.connect("tuned", self.path)
+        self.assertIsInstance(connections[alias], base.DatabaseWrapper)
+        benchmark_sqlite.Command().prepare("tuned", self.path, rows=10)
+        stats = benchmark_sqlite.worker(("tuned", self.path, 0.1, 0.5, 0))
+        self.assertGreater(stats["reads"], 0)
+        self.assertGreater(stats["writes"], 0)
+        self.assertEqual(stats["errors"], 0)
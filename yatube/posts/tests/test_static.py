@@ -0,0 +1,105 @@
+import gzip
+import os
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from django.utils.http import http_date
+
+from core.staticfiles import (IMMUTABLE_CACHE_CONTROL, SHORT_CACHE_CONTROL,
+                              CompressedManifestStaticFilesStorage)
+
+CSS = "body { color: #333; }\n" * 100
+
+
+class StaticPipelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        source = os.path.join(cls.tmp_dir.name, "source")
+        os.makedirs(os.path.join(source, "css"))
+        with open(os.path.join(source, "css", "site.css"), "w") as file:
+            file.write(CSS)
+        cls.settings = override_settings(
+            STATICFILES_DIRS=[source],
+            STATIC_ROOT=os.path.join(cls.tmp_dir.name, "root"),
+            INSTALLED_APPS=[app for app in settings.INSTALLED_APPS
+                            if app != "django.contrib.admin"])
+        cls.settings.enable()
+        call_command("collectstatic", interactive=False, verbosity=0)
+        cls.hashed_url = staticfiles_storage.url("css/site.css", force=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        cls.tmp_dir.cleanup()
+        super().tearDownClass()
+
+    def test_collectstatic_writes_hashed_and_gzipped_files(self):
+        name = self.hashed_url[len(settings.STATIC_URL):]
+        self.assertRegex(name, r"^css/site\.[0-9a-f]{12}\.css$")
+        self.assertTrue(os.path.exists(staticfiles_storage.path(name)
+                                       + ".gz"))
+
+    def test_hashed_file_is_immutable_and_precompressed(self):
+        response = self.client.get(self.hashed_url,
+                                   HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Cache-Control"], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        body = b"".join(response.streaming_content)
+        self.assertEqual(gzip.decompress(body).decode(), CSS)
+
+    def test_identity_without_accept_encoding(self):
+        for header in ("", "gzip;q=0"):
+            response = self.client.get(self.hashed_url,
+                                       HTTP_ACCEPT_ENCODING=header)
+            self.assertFalse(response.has_header("Content-Encoding"))
+            self.assertEqual(b"".join(response.streaming_content).decode(),
+                             CSS)
+
+    def test_not_modified_keeps_caching_headers(self):
+        response = self.client.get(self.hashed_url,
+                                   HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["Cache-Control"], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertTrue(response.has_header("Last-Modified"))
+
+    @override_settings(STATIC_MANIFEST_FALLBACK=False)
+    def test_missing_manifest_is_an_error(self):
+        with tempfile.TemporaryDirectory() as location:
+            storage = CompressedManifestStaticFilesStorage(location=location)
+            with self.assertRaises(ValueError):
+                storage.url("css/site.css")
+
+    @override_settings(STATIC_MANIFEST_FALLBACK=True)
+    def test_missing_manifest_falls_back_in_development(self):
+        with tempfile.TemporaryDirectory() as location:
+            storage = CompressedManifestStaticFilesStorage(location=location)
+            self.assertEqual(storage.url("css/site.css"),
+                             settings.STATIC_URL + "css/site.css")
+
+    @override_settings(STATIC_MANIFEST_FALLBACK=False)
+    def test_collected_file_outside_manifest_falls_back(self):
+        with open(staticfiles_storage.path("extra.txt"), "w") as file:
+            file.write("extra")
+        storage = CompressedManifestStaticFilesStorage()
+        self.assertEqual(storage.url("extra.txt"),
+                         settings.STATIC_URL + "extra.txt")
+        with self.assertRaises(ValueError):
+            storage.url("missing.txt")
+
+    def test_unhashed_name_gets_short_cache(self):
+        response = self.client.get(settings.STATIC_URL + "css/site.css")
+        self.assertEqual(response["Cache-Control"], SHORT_CACHE_CONTROL)
+
+    def test_path_traversal_is_not_served(self):
+        response = self.client.get(settings.STATIC_URL + "../source/css/"
+                                   "site.css")
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,156 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import tasks
+from core.cache import SQLiteCache
+from core.checks import shared_cache_check
+from core.models import Task
+from posts import feed_cache
+from posts.feed_cache import mark_refreshing, refreshing_key
+from posts.models import Group, Post
+from posts.tasks import warm_feeds
+
+User = get_user_model()
+
+calls = []
+
+
+@tasks.task(max_attempts=2)
+def flaky(value):
+    calls.append(value)
+    raise RuntimeError("сбой")
+
+
+@tasks.task()
+def remember_transaction_depth():
+    calls.append(len(connection.savepoint_ids))
+
+
+@override_settings(TASKS_MODE="db")
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_signup_enqueues_welcome_email(self):
+        self.client.post(reverse("users:signup"), {
+            "username": "newbie", "email": "newbie@example.com",
+            "password1": "Sup3r-secret!", "password2": "Sup3r-secret!",
+        })
+        task = Task.objects.get()
+        self.assertEqual(task.name, "users.tasks.send_welcome_email")
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(tasks.process_batch(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["newbie@example.com"])
+        self.assertFalse(Task.objects.exists())
+
+    def test_failed_task_is_retried_then_marked_failed(self):
+        tasks.enqueue(flaky, 1)
+        tasks.process_batch()
+        task = Task.objects.get()
+        self.assertEqual((task.status, task.attempts), (Task.QUEUED, 1))
+        self.assertGreater(task.run_at, timezone.now())
+        self.assertIn("сбой", task.last_error)
+        self.assertEqual(tasks.process_batch(), 0)
+        Task.objects.update(run_at=timezone.now())
+        tasks.process_batch()
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Task.FAILED, 2))
+        self.assertEqual(calls, [1, 1])
+
+    def test_task_runs_outside_a_transaction(self):
+        tasks.enqueue(remember_transaction_depth)
+        depth = len(connection.savepoint_ids)
+        tasks.process_batch()
+        self.assertEqual(calls, [depth])
+
+    def test_rolled_back_enqueue_leaves_no_task(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                tasks.enqueue(flaky, 1)
+                raise RuntimeError
+        self.assertFalse(Task.objects.exists())
+
+    def test_abandoned_task_is_reclaimed(self):
+        Task.objects.create(
+            name=flaky.task_name, payload='{"args": [2], "kwargs": {}}',
+            status=Task.RUNNING, attempts=1,
+            locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(len(tasks.claim_tasks(10)), 1)
+
+    def test_queue_depth(self):
+        tasks.enqueue(flaky, 1)
+        tasks.enqueue(flaky, 2)
+        Task.objects.filter(pk=Task.objects.first().pk).update(
+            status=Task.FAILED)
+        depth = tasks.queue_depth()
+        self.assertEqual((depth["queued"], depth["failed"]), (1, 1))
+        self.assertEqual(depth["running"], 0)
+
+
+class WarmFeedsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="Test")
+        cls.group = Group.objects.create(title="Группа", slug="group")
+        Post.objects.create(author=cls.user, group=cls.group, text="Пост")
+
+    def test_warmed_feeds_are_served_from_cache(self):
+        warm_feeds(["index", f"author:{self.user.pk}",
+                    f"group:{self.group.pk}"])
+        feed_cache.stats.clear()
+        for url in (reverse("posts:index"),
+                    reverse("posts:profile", args=["Test"]),
+                    reverse("posts:slug", args=["group"])):
+            self.client.get(url)
+        self.assertEqual(feed_cache.stats["index:hit"], 1)
+        self.assertEqual(feed_cache.stats["author:hit"], 1)
+        self.assertEqual(feed_cache.stats["group:hit"], 1)
+
+    def test_refresh_marks_are_shared_with_task_runner(self):
+        feed = f"group:{self.group.pk}"
+        mark_refreshing([feed])
+        # run_tasks — отдельный процесс со своим подключением к кэшу.
+        SQLiteCache("default", {}).delete(refreshing_key(feed))
+        self.assertIsNone(feed_cache.cache.get(refreshing_key(feed)))
+
+    @override_settings(TASKS_MODE="db")
+    def test_stale_page_has_no_validators(self):
+        index = reverse("posts:index")
+        self.client.get(index)
+        author = Client()
+        author.force_login(self.user)
+        author.post(reverse("posts:post_create"), {"text": "Свежий пост"})
+        stale = self.client.get(index)
+        self.assertNotContains(stale, "Свежий пост")
+        self.assertFalse(stale.has_header("ETag"))
+        self.assertFalse(stale.has_header("Last-Modified"))
+        self.assertIn("no-cache", stale["Cache-Control"])
+        tasks.process_batch()
+        fresh = self.client.get(index)
+        self.assertContains(fresh, "Свежий пост")
+        self.assertTrue(fresh.has_header("ETag"))
+
+
+LOCMEM = {"default": {
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class SharedCacheCheckTests(TestCase):
+    @override_settings(TASKS_MODE="db", CACHES=LOCMEM)
+    def test_process_local_cache_with_task_runner_is_an_error(self):
+        self.assertEqual([error.id for error in shared_cache_check(None)],
+                         ["core.E001"])
+
+    @override_settings(TASKS_MODE="thread", CACHES=LOCMEM)
+    def test_in_process_tasks_allow_local_cache(self):
+        self.assertEqual(shared_cache_check(None), [])
+
+    def test_shared_cache_passes(self):
+        self.assertEqual(shared_cache_check(None), [])
@@ -1,7 +1,8 @@
 from django import forms
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.test import Client, TestCase, TransactionTestCase
 from django.urls import reverse
 
 from posts.models import Group, Post
@@ -67,6 +68,21 @@ class PostPagesTests(TestCase):
                 self.assertEqual(post_author_0, self.post.author)
                 self.assertEqual(post_group_0, self.group.slug)
 
+    def test_feeds_defer_full_text(self):
+        """Ленты не читают полный текст и показывают анонс."""
+        long_post = Post.objects.create(text="<b>длинно</b> " * 100,
+                                        author=self.user)
+        for url in (reverse("posts:index"),
+                    reverse("posts:profile", args=[self.user.username])):
+            with self.subTest(url=url):
+                cache.clear()
+                response = self.authorized_client.get(url)
+                first_object = response.context["page_obj"][0]
+                self.assertEqual(first_object.get_deferred_fields(),
+                                 {"text", "text_html"})
+                self.assertContains(response, "&lt;b&gt;длинно")
+                self.assertNotContains(response, long_post.text[-50:])
+
     def test_post_edit_correct_context(self):
         response = self.authorized_client.get(reverse("posts:post_edit",
                                                       args=[self.post.id]))
@@ -141,3 +157,82 @@ class TestPaginator(TestCase):
                 self.assertEqual(
                     len(response.context["page_obj"]),
                     settings.QUANTITY_POSTS)
+
+
+class TestCursorPaginator(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f"пост {i}")
+            for i in range(settings.QUANTITY_POSTS * 2 + 3)
+        )
+
+    def test_cursor_pages_cover_feed(self):
+        """Переход по курсорам проходит всю ленту без повторов."""
+        url = reverse("posts:index")
+        response = self.client.get(url)
+        page_obj = response.context["page_obj"]
+        self.assertFalse(page_obj.has_previous())
+        seen = [post.pk for post in page_obj]
+        while page_obj.has_next():
+            response = self.client.get(url, {"after": page_obj.next_cursor})
+            page_obj = response.context["page_obj"]
+            seen.extend(post.pk for post in page_obj)
+        expected = list(Post.objects.order_by("-pub_date", "-id")
+                        .values_list("pk", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_before_cursor_returns_previous_page(self):
+        url = reverse("posts:index")
+        first = self.client.get(url).context["page_obj"]
+        second = self.client.get(
+            url, {"after": first.next_cursor}).context["page_obj"]
+        back = self.client.get(
+            url, {"before": second.previous_cursor}).context["page_obj"]
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+
+    def test_legacy_page_number_still_works(self):
+        response = self.client.get(reverse("posts:index"), {"page": 3})
+        self.assertEqual(response.context["page_obj"].number, 3)
+        self.assertEqual(len(response.context["page_obj"]), 3)
+
+    def test_broken_cursor_falls_back_to_first_page(self):
+        response = self.client.get(reverse("posts:index"),
+                                   {"after": "не-курсор"})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context["page_obj"].has_previous())
+
+
+class TestCachedCountPaginator(TransactionTestCase):
+    """Сброс счётчика идёт в on_commit, поэтому нужны настоящие коммиты."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username=USERNAME)
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f"пост {i}")
+            for i in range(settings.QUANTITY_POSTS * 20)
+        )
+
+    def test_page_window_is_elided(self):
+        response = self.client.get(reverse("posts:index"), {"page": 10})
+        self.assertEqual(response.context["page_obj"].page_window,
+                         [1, None, 8, 9, 10, 11, 12, None, 20])
+
+    def test_index_count_is_cached(self):
+        url = reverse("posts:index")
+        self.client.get(url, {"page": 2})
+        # Агрегат для ETag и сама страница, без пересчёта числа постов.
+        with self.assertNumQueries(2):
+            self.client.get(url, {"page": 3})
+
+    def test_new_post_resets_cached_count(self):
+        url = reverse("posts:index")
+        self.client.get(url, {"page": 2})
+        Post.objects.create(author=self.user, text="новый")
+        response = self.client.get(url, {"page": 2})
+        self.assertEqual(response.context["page_obj"].paginator.count,
+                         settings.QUANTITY_POSTS * 20 + 1)
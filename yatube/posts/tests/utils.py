@@ -0,0 +1,22 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.budgets import get_query_budget
+
+
+class QueryBudgetMixin:
+    """Проверка, что страница укладывается в объявленный бюджет запросов."""
+
+    def assertQueryBudget(self, client, url_name, *args, **kwargs):
+        budget = get_query_budget(url_name, *args, **kwargs)
+        self.assertIsNotNone(budget, f"У {url_name} не объявлен бюджет")
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse(url_name, args=args,
+                                          kwargs=kwargs))
+        sql = "\n".join(query["sql"] for query in queries.captured_queries)
+        self.assertLessEqual(
+            len(queries), budget,
+            f"{url_name}: {len(queries)} запросов при бюджете {budget}\n{sql}"
+        )
+        return response, len(queries)
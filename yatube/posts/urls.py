@@ -7,8 +7,17 @@ app_name = "posts"
 urlpatterns = [
     path("", views.index, name="index"),
     path("create/", views.post_create, name="post_create"),
+    path("search/", views.search, name="search"),
     path("group/<slug:slug>/", views.group_posts, name="slug"),
+    path("group/<slug:slug>/export.csv", views.group_export,
+         name="group_export"),
     path("profile/<str:username>/", views.profile, name="profile"),
+    path("profile/<str:username>/export.jsonl", views.profile_export,
+         name="profile_export"),
     path("posts/<int:post_id>/", views.post_detail, name="post_detail"),
     path("posts/<int:post_id>/edit/", views.post_edit, name="post_edit"),
+    path("api/posts/since/<int:post_id>/", views.posts_since,
+         name="posts_since"),
+    path("api/post-cache/metrics/", views.post_cache_metrics,
+         name="post_cache_metrics"),
 ]
@@ -0,0 +1,15 @@
+from contextlib import contextmanager
+
+from .models import Post
+
+
+@contextmanager
+def keep_dates():
+    """Отключает auto_now_add/auto_now, чтобы сохранить заданные даты."""
+    pub_date = Post._meta.get_field("pub_date")
+    updated_at = Post._meta.get_field("updated_at")
+    pub_date.auto_now_add = updated_at.auto_now = False
+    try:
+        yield
+    finally:
+        pub_date.auto_now_add = updated_at.auto_now = True
@@ -1,29 +1,75 @@
+import math
+import os
+
 from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.http import urlencode
+
+from core.replicas import is_pinned, replica_view
 
+from .budgets import query_budget
+from .conditional import (conditional_view, group_state, index_state,
+                          post_state, profile_state)
+from .exports import FORMATS, export_rows
+from .feed_cache import finish_refreshing, mark_refreshing, post_pages
 from .forms import PostForm
-from .models import Group, Post, User
+from .live import MAX_POSTS, MAX_WAIT, latest_id, wait_for_post_after
+from .models import EditConflict, Group, Post, User
+from .paginators import INDEX_COUNT_KEY, CursorPaginator
+from .post_cache import get_post, metrics
+from .search import fts_available, search_posts
+from .tasks import refresh_pages
 
+# Ленты выводят только анонс: полный текст и его HTML из базы не читаем.
+FEED_DEFERRED = ("text", "text_html")
 
-def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, settings.QUANTITY_POSTS)
+
+def counted_posts(owner):
+    """Число постов автора или группы из денормализованного счётчика."""
+    try:
+        return owner.post_counter.posts_count
+    except ObjectDoesNotExist:
+        return 0
+
+
+def get_page_obj(request, queryset, **paginator_kwargs):
+    """Страница ленты: по курсору или по номеру для старых ссылок."""
+    paginator = CursorPaginator(queryset, settings.QUANTITY_POSTS,
+                                **paginator_kwargs)
     page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    if page_number is not None:
+        return paginator.get_page(page_number)
+    return paginator.get_cursor_page(after=request.GET.get("after"),
+                                     before=request.GET.get("before"))
+
+
+@query_budget(6)
+@replica_view
+@conditional_view(index_state)
+def index(request):
+    post_list = (Post.objects.select_related("author", "group")
+                 .defer(*FEED_DEFERRED))
+    page_obj = get_page_obj(request, post_list, count_key=INDEX_COUNT_KEY)
     context = {
         "page_obj": page_obj,
     }
     return render(request, "posts/index.html", context)
 
 
+@query_budget(5)
+@replica_view
+@conditional_view(group_state)
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts_list = group.posts.all()
-    paginator = Paginator(posts_list, settings.QUANTITY_POSTS)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    group = get_object_or_404(Group.objects.select_related("post_counter"),
+                              slug=slug)
+    posts_list = (group.posts.select_related("author", "group")
+                  .defer(*FEED_DEFERRED))
+    page_obj = get_page_obj(request, posts_list,
+                            get_count=lambda: counted_posts(group))
     context = {
         "group": group,
         "page_obj": page_obj,
@@ -31,13 +77,16 @@ def group_posts(request, slug):
     return render(request, "posts/group_list.html", context)
 
 
+@query_budget(5)
+@replica_view
+@conditional_view(profile_state)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    profile_list = author.posts.all()
-    paginator = Paginator(profile_list, settings.QUANTITY_POSTS)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
-
+    author = get_object_or_404(User.objects.select_related("post_counter"),
+                               username=username)
+    profile_list = author.posts.select_related("group").defer(
+        *FEED_DEFERRED)
+    page_obj = get_page_obj(request, profile_list,
+                            get_count=lambda: counted_posts(author))
     context = {
         "author": author,
         "page_obj": page_obj,
@@ -45,25 +94,139 @@ def profile(request, username):
     return render(request, "posts/profile.html", context)
 
 
+@query_budget(4)
+@replica_view
+@conditional_view(post_state)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_post(
+        post_id,
+        lambda: Post.objects.select_related("author__post_counter", "group")
+        .filter(id=post_id).first(),
+        fresh=is_pinned(request))
+    if post is None:
+        raise Http404("Пост не найден")
     context = {
         "post": post,
     }
     return render(request, "posts/post_detail.html", context)
 
 
+def export_response(queryset, filename, fmt):
+    """Потоковая выгрузка: первый байт уходит до чтения всех постов."""
+    render_lines, content_type = FORMATS[fmt]
+    response = StreamingHttpResponse(render_lines(export_rows(queryset)),
+                                     content_type=content_type)
+    response["Content-Disposition"] = (
+        f'attachment; filename="{filename}.{fmt}"')
+    return response
+
+
+@query_budget(3)
+def profile_export(request, username):
+    author = get_object_or_404(User, username=username)
+    return export_response(author.posts.all(), author.username, "jsonl")
+
+
+@query_budget(3)
+def group_export(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return export_response(group.posts.all(), group.slug, "csv")
+
+
+def post_as_json(post):
+    return {
+        "id": post.pk,
+        "text": post.text,
+        "pub_date": post.pub_date.isoformat(),
+        "author": post.author.username,
+        "author_name": post.author.get_full_name(),
+        "group": post.group.slug if post.group else None,
+        "profile_url": post.get_author_url(),
+        "url": post.get_absolute_url(),
+        "group_url": post.group.get_absolute_url() if post.group else None,
+    }
+
+
+@query_budget(4)
+def posts_since(request, post_id):
+    """Посты новее post_id; с ?wait=N ждёт их до N секунд (long-poll)."""
+    posts = Post.objects.select_related("author", "group").filter(
+        id__gt=post_id).order_by("id")
+    if request.GET.get("group"):
+        posts = posts.filter(group__slug=request.GET["group"])
+    if request.GET.get("author"):
+        posts = posts.filter(author__username=request.GET["author"])
+    try:
+        wait = float(request.GET.get("wait", 0))
+    except ValueError:
+        wait = 0
+    # nan проходит через min/max и ждал бы вечно, inf — тоже.
+    if not math.isfinite(wait):
+        wait = 0
+    wait = min(max(wait, 0), MAX_WAIT)
+    seen_id = max(post_id, latest_id())
+    new_posts = list(posts[:MAX_POSTS])
+    if not new_posts and wait:
+        wait_for_post_after(seen_id, wait)
+        new_posts = list(posts[:MAX_POSTS])
+    return JsonResponse({
+        "posts": [post_as_json(post) for post in new_posts],
+        "last_id": new_posts[-1].pk if new_posts else post_id,
+    })
+
+
+@query_budget(2)
+@staff_member_required
+def post_cache_metrics(request):
+    """Счётчики кэша снимков постов воркера, ответившего на запрос."""
+    return JsonResponse({"pid": os.getpid(), **metrics()})
+
+
+@query_budget(4)
+def search(request):
+    """Полнотекстовый поиск по постам."""
+    query = request.GET.get("q", "").strip()
+    if fts_available():
+        page_obj = search_posts(query, settings.QUANTITY_POSTS,
+                                after=request.GET.get("after"),
+                                before=request.GET.get("before"))
+    else:
+        posts = (Post.objects.select_related("author", "group")
+                 .filter(text__icontains=query))
+        page_obj = get_page_obj(request, posts)
+    context = {
+        "query": query,
+        "page_obj": page_obj,
+        "page_query": f"{urlencode({'q': query})}&",
+    }
+    return render(request, "posts/search.html", context)
+
+
+@query_budget(3)
 @login_required
 def post_create(request):
     """Функция создания нового поста"""
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         form.instance.author = request.user
-        form.save()
+        feeds = post_pages(form.instance)
+        mark_refreshing(feeds)
+        post = form.save()
+        refresh_pages(feeds | post_pages(post),
+                      post if post.image else None)
         return redirect("posts:profile", username=request.user)
     return render(request, "posts/create_post.html", {"form": form, })
 
 
+def edited_version(request, post):
+    """Версия поста, открытая в форме; без поля — текущая версия."""
+    try:
+        return int(request.POST["version"])
+    except (KeyError, ValueError):
+        return post.version
+
+
+@query_budget(5)
 @login_required
 def post_edit(request, post_id):
     """Функция редактирования поста"""
@@ -72,10 +235,32 @@ def post_edit(request, post_id):
     if post.author != request.user:
         return redirect("posts:post_detail", post_id=post.id)
 
-    form = PostForm(request.POST or None, instance=post)
+    # Форма меняет instance при проверке, ленты до правки берутся заранее.
+    feeds = post_pages(post)
+    version = edited_version(request, post)
+    form = PostForm(request.POST or None, files=request.FILES or None,
+                    instance=post)
     if form.is_valid():
-        form.save()
-        return redirect("posts:post_detail", post_id=post.id)
-    else:
-        return render(request, "posts/create_post.html",
-                      {"form": form, "post": post, "is_edit": is_edit, })
+        if not form.has_changed():
+            # Ничего не поменялось: ни записи, ни инвалидации кэшей.
+            return redirect("posts:post_detail", post_id=post.id)
+        mark_refreshing(feeds)
+        try:
+            post.save_changes(form.changed_data, version)
+        except EditConflict:
+            finish_refreshing(feeds)
+            form.add_error(None, "Пост успели изменить, пока вы его "
+                                 "редактировали. Проверьте текст и "
+                                 "сохраните ещё раз.")
+            post = get_object_or_404(Post, id=post_id)
+            version = post.version
+        else:
+            new_image = "image" in form.changed_data and post.image
+            refresh_pages(feeds | post_pages(post),
+                          post if new_image else None)
+            return redirect("posts:post_detail", post_id=post.id)
+    # Ошибочная форма несёт ту версию, с которой её открыли: иначе
+    # следующая отправка молча перезапишет чужую правку.
+    return render(request, "posts/create_post.html",
+                  {"form": form, "post": post, "is_edit": is_edit,
+                   "version": version, })
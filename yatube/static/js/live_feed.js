@@ -0,0 +1,58 @@
+// Подгружает новые посты в ленту без перезагрузки страницы (long-poll).
+(function () {
+  var feed = document.querySelector("[data-live-feed]");
+  if (!feed) {
+    return;
+  }
+  var lastId = parseInt(feed.dataset.liveSince, 10) || 0;
+
+  function link(href, text) {
+    var a = document.createElement("a");
+    a.href = href;
+    a.textContent = text;
+    return a;
+  }
+
+  function render(post) {
+    var item = document.createElement("div");
+    var meta = document.createElement("ul");
+    var author = document.createElement("li");
+    author.textContent = "Автор: " + post.author_name + " ";
+    author.appendChild(link(post.profile_url, "Все посты пользователя"));
+    var date = document.createElement("li");
+    date.textContent = "Дата публикации: " +
+      new Date(post.pub_date).toLocaleDateString("ru-RU");
+    meta.appendChild(author);
+    meta.appendChild(date);
+    var text = document.createElement("p");
+    text.textContent = post.text;
+    var details = document.createElement("p");
+    details.appendChild(link(post.url, "Подробная информация"));
+    item.appendChild(meta);
+    item.appendChild(text);
+    item.appendChild(details);
+    if (post.group_url) {
+      var group = document.createElement("p");
+      group.appendChild(link(post.group_url, "Все записи группы"));
+      item.appendChild(group);
+    }
+    item.appendChild(document.createElement("hr"));
+    return item;
+  }
+
+  function poll() {
+    var url = feed.dataset.liveUrl.replace(/0\/$/, lastId + "/") + "?wait=25";
+    fetch(url, {credentials: "same-origin"})
+      .then(function (response) { return response.json(); })
+      .then(function (data) {
+        data.posts.forEach(function (post) {
+          feed.insertBefore(render(post), feed.firstChild);
+        });
+        lastId = data.last_id;
+        poll();
+      })
+      .catch(function () { setTimeout(poll, 10000); });
+  }
+
+  poll();
+})();
@@ -0,0 +1,18 @@
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mail
+from django.template.loader import render_to_string
+
+from core.tasks import task
+
+User = get_user_model()
+
+
+@task()
+def send_welcome_email(user_id):
+    """Письмо после регистрации; без адреса почты ничего не делает."""
+    user = User.objects.filter(pk=user_id).first()
+    if user is None or not user.email:
+        return
+    send_mail("Добро пожаловать в Yatube",
+              render_to_string("users/welcome_email.txt", {"user": user}),
+              None, [user.email])
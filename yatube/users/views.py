@@ -2,10 +2,18 @@ from django.views.generic import CreateView
 
 from django.urls import reverse_lazy
 
+from core.tasks import enqueue
+
 from .forms import CreationForm
+from .tasks import send_welcome_email
 
 
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy("posts:index")
     template_name = "users/signup.html"
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        enqueue(send_welcome_email, self.object.pk)
+        return response
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'sorl.thumbnail',
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
@@ -45,12 +46,16 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.staticfiles.StaticFilesMiddleware',
+    'core.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.replicas.ReplicaMiddleware',
+    'core.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
@@ -80,11 +85,57 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # Stock sqlite3 backend plus WAL, busy_timeout and lock retries.
+        'ENGINE': 'core.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Read replicas for read-only views (see core.replicas). A local copy of
+# db.sqlite3 refreshed by `manage.py sync_replica` is enough for testing:
+# set YATUBE_REPLICA to the path of the copy.
+DATABASE_REPLICAS = []
+if os.environ.get('YATUBE_REPLICA'):
+    DATABASES['replica'] = {
+        'ENGINE': 'core.backends.sqlite3',
+        'NAME': os.environ['YATUBE_REPLICA'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS = ['replica']
+
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+
+# After a write the session reads only from the primary for this long.
+PIN_TO_PRIMARY_SECONDS = 10
+
+# Per-request profiling: requests with a signed X-Profile header
+# (manage.py profiling_token) plus this share of all traffic.
+PROFILING_SAMPLE_RATE = float(os.environ.get('YATUBE_PROFILING_RATE', 0))
+PROFILING_TOKEN_MAX_AGE = 60 * 60
+PROFILING_DIR = os.path.join(BASE_DIR, 'profiles')
+PROFILING_KEEP = 200
+
+
+# Feed generations and fragments, refresh marks, the index count and
+# sessions must be shared by every web worker and by run_tasks. The cache
+# lives in its own SQLite file next to the 'default' database (see
+# core.cache); switch BACKEND to memcached when running on several hosts.
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.SQLiteCache',
+        'LOCATION': 'default',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    }
+}
+
+
+# Sessions are read through the cache, so anonymous feed requests with
+# a session cookie do not touch the database; flash messages live in a
+# cookie and never load the session.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -126,11 +177,40 @@ STATIC_URL = "/static/"
 
 STATICFILES_DIRS = (os.path.join(BASE_DIR, "static"),)
 
+# collectstatic writes hashed names plus .gz/.br copies here, and
+# core.staticfiles.StaticFilesMiddleware serves them with far-future
+# caching.
+STATIC_ROOT = os.path.join(BASE_DIR, "collected_static")
+STATICFILES_STORAGE = "core.staticfiles.CompressedManifestStaticFilesStorage"
+# Before collectstatic, link to the source files instead of failing on
+# the missing manifest. Only in development: read here because the test
+# runner switches DEBUG off at run time.
+STATIC_MANIFEST_FALLBACK = DEBUG
+
+MEDIA_URL = "/media/"
+MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+
+# Thumbnail metadata lives in the cache with the database as a fallback,
+# so looking up a ready rendition never touches the disk.
+THUMBNAIL_KVSTORE = "sorl.thumbnail.kvstores.cached_db_kvstore.KVStore"
+THUMBNAIL_QUALITY = 85
+THUMBNAIL_UPSCALE = False
+
 LOGIN_URL = "users:login"
 LOGIN_REDIRECT_URL = "posts:index"
 
 
+# Background tasks (core.tasks): "db" for the run_tasks worker,
+# "thread" for an in-process pool in development, "immediate" to run
+# right after commit.
+TASKS_MODE = os.environ.get('YATUBE_TASKS_MODE', 'thread' if DEBUG else 'db')
+TASKS_THREADS = 2
+
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
 QUANTITY_POSTS = 10
+
+# Per-worker LRU of post snapshots for post_detail.
+POST_CACHE_SIZE = 1000
+POST_CACHE_TTL = 60